@@ -1,146 +1,106 @@
+"""The Castle Point Borough Council refuse collection integration.
+
+Home Assistant modules are imported inside the setup functions rather than
+at module level, so that the offline crawler
+(``python -m custom_components.cpbc_refuse_collection.crawler``) can import
+this package without Home Assistant installed.
+"""
+from __future__ import annotations
+
 import logging
-from datetime import datetime, timedelta
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.util.dt import start_of_local_day, as_utc, parse_datetime
-
-from .const import DOMAIN
-from .calendar import CpbcRefuseCollectionCalendar
-from .sensor import CpbcRefuseCollectionSensor
-from .common import fetch_road_names_and_ids
-
-from bs4 import BeautifulSoup
-import voluptuous as vol
-from aiohttp import ClientSession
-import re
-import calendar
+import secrets
+from typing import TYPE_CHECKING
+
+from .const import CONF_ICS_TOKEN, DATA_ICS_TOKENS, DOMAIN, PLATFORMS
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup(hass: HomeAssistant, config: dict):
     """Set up the CPBC Refuse Collection Calendar component."""
-    hass.data[DOMAIN] = {}
+    from .ics import CpbcRefuseCollectionIcsView
+
+    hass.data.setdefault(DOMAIN, {})
+    hass.http.register_view(CpbcRefuseCollectionIcsView())
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up CPBC Refuse Collection Calendar from a config entry."""
+    from .coordinator import async_get_coordinator_registry
+
     road_id = entry.data.get("road_id")
     if not road_id:
         _LOGGER.error("No road_id found in config entry")
         return False
     try:
-        coordinator = CpbcRefuseCollectionCalendarDataCoordinator(hass, road_id)
-        await coordinator.async_refresh()
+        coordinator = await async_get_coordinator_registry(hass).async_acquire(road_id)
     except Exception as e:
         _LOGGER.error(f"Error setting up coordinator: {e}")
         return False
 
-    hass.data[DOMAIN][entry.entry_id] = {
+    await _async_migrate_unique_ids(hass, entry)
+    if CONF_ICS_TOKEN not in entry.data:
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_ICS_TOKEN: secrets.token_urlsafe()}
+        )
+
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
         "coordinator": coordinator,
-        "calendar": CpbcRefuseCollectionCalendar(coordinator),
-        "sensor": CpbcRefuseCollectionSensor(coordinator)
     }
+    hass.data.setdefault(DATA_ICS_TOKENS, {})[entry.data[CONF_ICS_TOKEN]] = entry.entry_id
 
-    # Setup calendar
-    hass.async_create_task(
-        hass.config_entries.async_forward_entry_setup(entry, "calendar")
-    )
-    # Setup sensor
-    hass.async_create_task(
-        hass.config_entries.async_forward_entry_setup(entry, "sensor")
-    )
+    # Setup calendar and sensor
+    for platform in PLATFORMS:
+        hass.async_create_task(
+            hass.config_entries.async_forward_entry_setup(entry, platform)
+        )
     return True
 
-class CpbcRefuseCollectionCalendarDataCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching CPBC Refuse Collection Calendar data."""
+async def _async_migrate_unique_ids(hass: HomeAssistant, entry: ConfigEntry):
+    """Move the calendar and next collection sensor to unique IDs keyed on the entry.
 
-    def __init__(self, hass, road_id):
-        """Initialize."""
-        self.road_id = road_id
-        update_interval = timedelta(days=1)  # Update every 1 day
+    Both used to be keyed on a constant or the road ID, so a second entry for
+    the same road had them rejected as duplicates.
+    """
+    from homeassistant.helpers import entity_registry as er
 
-        super().__init__(
-            hass,
-            _LOGGER,
-            name="Castle Point Borough Council Refuse Collection Calendar",
-            update_method=self._async_update_data,
-            update_interval=update_interval,
-        )
+    old_ids = {
+        "cpbc_refuse_collection_unique_id": f"cpbc_refuse_collection_calendar_{entry.entry_id}",
+        f"cpbc_refuse_collection_next_event_{entry.data.get('road_id')}":
+            f"cpbc_refuse_collection_next_event_{entry.entry_id}",
+    }
+
+    def migrate(registry_entry):
+        new_id = old_ids.get(registry_entry.unique_id)
+        if new_id is None:
+            return None
+        _LOGGER.debug("Migrating unique ID %s to %s", registry_entry.unique_id, new_id)
+        return {"new_unique_id": new_id}
+
+    await er.async_migrate_entries(hass, entry.entry_id, migrate)
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Unload a config entry."""
+    from .coordinator import async_get_coordinator_registry
 
-    async def _async_update_data(self):
-        """Fetch data."""
-        collection_events = []
-        _LOGGER.debug("Coordinator update road ID: %s", self.road_id)
-        
-        try:
-            url = f'https://apps.castlepoint.gov.uk/cpapps/index.cfm?fa=wastecalendar.displayDetails&roadID={self.road_id}'
-            _LOGGER.debug("Coordinator update URL: %s", url)
-            try:
-                async with ClientSession() as session:
-                    async with session.get(url) as response:
-                        if response.status != 200:
-                            _LOGGER.error("Error fetching data: URL: %s, Status: %s", url, response.status)
-                            return {"events": []}
-                        html_content = await response.text()
-        
-                soup = BeautifulSoup(html_content, 'html.parser') 
-                collection_months = soup.find_all(class_="calendarContainer")
-                dedup_collection_months = []
-                    
-                for outer_range, outer_value in enumerate(collection_months):
-                    try:
-                        if outer_value:
-                            soup = BeautifulSoup(str(outer_value), 'html.parser')
-                            outer_month = soup.find("h2")
-                            for inner_range in range(outer_range + 1, len(collection_months)):
-                                soup = BeautifulSoup(str(collection_months[inner_range]), 'html.parser')
-                                inner_month = soup.find("h2")
-
-                                if outer_month == inner_month:
-                                    dedup_collection_months.append(outer_value)
-                    except Exception as outer_exc:
-                        print(f"Error in outer loop ({outer_range}): {outer_exc}")
-
-                for month in dedup_collection_months:
-                    soup = BeautifulSoup(str(month), 'html.parser')
-                    rex_search = re.search("<h2>(?P<month>.+)\s(?P<year>\d+)<\/h2>", str(soup.find("h2")))
-                    collection_month = f"{list(calendar.month_name).index(str(rex_search.group('month'))):02d}"
-                    collection_year = int(rex_search.group('year'))
-                    scheduled_collections = soup.find_all(class_=["pink","normal"])
-                    
-                    for scheduled_collection in scheduled_collections:
-                        _LOGGER.debug("Scheduled collection: %s", scheduled_collection)
-                        rex_search = re.search("<td.+?class=\"(?P<class>.+?)\".+?(?P<day>\d+)<.+", str(scheduled_collection))
-                        # ammend class: normal = black / pink = pink
-                        collection_class = ("black", "pink")[str(rex_search.group('class')) == "pink"]
-                        collection_days = f"{int(rex_search.group('day')):02d}"
-                        start_string = str(collection_year) + "-" + str(collection_month) + "-" + str(collection_days)
-                        end_string = str(collection_year) + "-" + str(collection_month) + "-" + str(int(collection_days)+1)
-                        start_datetime = as_utc(start_of_local_day(parse_datetime(start_string)))
-                        _LOGGER.debug("CPBC collection start_datetime: %s", start_datetime)
-                        end_datetime = start_datetime + timedelta(hours=13)
-                        _LOGGER.debug("CPBC collection end_datetime: %s", end_datetime)
-                        if start_datetime and end_datetime:
-                            collection_events.append({ "summary": "CPBC Refuse Collection", "description": str(collection_class), "start": start_datetime, "end": end_datetime,})
-                        else:
-                            _LOGGER.error(f"Invalid date format: {start_string} to {end_string}")
-                _LOGGER.debug("Events: %s", collection_events)
-                return {"events": collection_events}
-            except Exception as e:
-                _LOGGER.error("Error fetching data: URL: %s, Exception: %s", url, e)
-                raise UpdateFailed(f"Error updating data: {e}")        
-        except Exception as e:
-            raise UpdateFailed(f"Error updating data: {e}")
-
-    async def async_get_events(self, hass, start_date, end_date):
-        """Return calendar events within a datetime range."""
-        # Filter and return events from self.coordinator.data that fall within
-        # the range defined by start_date and end_date.
-        return [
-            event for event in self.coordinator.data.get("events", [])
-            if start_date <= self._get_datetime(event["start"]) <= end_date
-        ]
-        
-    async def _fetch_road_names_and_ids(self):
-        return await fetch_road_names_and_ids()
\ No newline at end of file
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data.get(DATA_ICS_TOKENS, {}).pop(entry.data.get(CONF_ICS_TOKEN), None)
+        await async_get_coordinator_registry(hass).async_release(entry_data["coordinator"].road_id)
+    return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Remove the saved schedule once no entry uses its road."""
+    from .coordinator import snapshot_store
+
+    road_id = entry.data.get("road_id")
+    if not road_id:
+        return
+    for other in hass.config_entries.async_entries(DOMAIN):
+        if other.entry_id != entry.entry_id and other.data.get("road_id") == road_id:
+            return
+    await snapshot_store(hass, road_id).async_remove()
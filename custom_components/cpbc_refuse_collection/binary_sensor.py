@@ -0,0 +1,40 @@
+import logging
+from homeassistant.components.binary_sensor import BinarySensorEntity
+
+from .const import DOMAIN
+from .entity import CpbcRefuseCollectionDerivedEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Set up CPBC Refuse Collection binary sensors based on a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]['coordinator']
+    async_add_entities([CpbcRefuseCollectionBinNightSensor(coordinator, entry)])
+
+class CpbcRefuseCollectionBinNightSensor(CpbcRefuseCollectionDerivedEntity, BinarySensorEntity):
+    """On the day before a collection, when the bins go out."""
+
+    def __init__(self, coordinator, entry):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._unique_id = f"cpbc_refuse_collection_bin_night_{entry.entry_id}"
+
+    @property
+    def unique_id(self):
+        """Return a unique ID for the sensor."""
+        return self._unique_id
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return "CPBC Bin Night Tonight"
+
+    @property
+    def is_on(self):
+        """Return True if a collection is due tomorrow."""
+        return self.derived.bin_night
+
+    @property
+    def extra_state_attributes(self):
+        """Return the bins to put out tonight."""
+        return {"bins": self.derived.bins_out_tonight}
@@ -2,7 +2,7 @@ import logging
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
-from homeassistant.util.dt import start_of_local_day, as_utc, as_local
+from homeassistant.util.dt import start_of_local_day, as_utc
 
 from datetime import datetime, timedelta
 from .const import DOMAIN
@@ -13,7 +13,7 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the calendar entries."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
-    async_add_entities([CpbcRefuseCollectionCalendar(coordinator)], True)
+    async_add_entities([CpbcRefuseCollectionCalendar(coordinator, config_entry)], True)
     
     road_id = config_entry.data.get("road_id")
 
@@ -23,11 +23,11 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
 class CpbcRefuseCollectionCalendar(CalendarEntity, CoordinatorEntity):
     """A calendar entity."""
-    def __init__(self, coordinator):
+    def __init__(self, coordinator, entry):
         """Initialize the calendar."""
         super().__init__(coordinator)
         self._name = "Castle Point Refuse Collection Calendar"
-        self._unique_id = "cpbc_refuse_collection_unique_id"
+        self._unique_id = f"cpbc_refuse_collection_calendar_{entry.entry_id}"
         self._event = None
 
     @property
@@ -53,27 +53,10 @@ class CpbcRefuseCollectionCalendar(CalendarEntity, CoordinatorEntity):
     def event(self) -> CalendarEvent:
         """Return the next upcoming event."""
         if self.coordinator.data:
-            events = self.coordinator.data.get("events", [])
-            _LOGGER.debug("Events data: %s", events)
-
-            # Find the next upcoming event
-            current_time = as_local(datetime.now())
-            next_event = None
-            for event in events:
-                start_time = as_local(event["start"])
-                if start_time >= current_time:
-                    if next_event is None or start_time < next_event["start"]:
-                        next_event = event
-
+            next_event = self.coordinator.data["index"].next_calendar_event(dt_util.utcnow())
             if next_event:
                 _LOGGER.debug("Next Event: %s", next_event)
-                return CalendarEvent(
-                    summary=next_event["summary"],
-                    start=next_event["start"],
-                    end=next_event["end"],
-                    location=next_event.get("location", ""),  # Add default if no location
-                    description=next_event.get("description", "")  # Add default if no description
-                )
+            return next_event
         return None
 
     def _get_datetime(self, time_str):
@@ -88,16 +71,6 @@ class CpbcRefuseCollectionCalendar(CalendarEntity, CoordinatorEntity):
 
     async def async_get_events(self, hass, start_date, end_date):
         """Return calendar events within a datetime range."""
-        events = []
-        for event_data in self.coordinator.data.get("events", []):
-            event_start = event_data["start"]
-            event_end = event_data["end"]
-            
-            if start_date <= event_start <= end_date:
-                events.append(CalendarEvent(
-                    summary=event_data["summary"],
-                    start=event_start,
-                    end=event_end
-                ))
-
-        return events
\ No newline at end of file
+        if not self.coordinator.data:
+            return []
+        return self.coordinator.data["index"].calendar_events_between(start_date, end_date)
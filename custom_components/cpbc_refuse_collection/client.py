@@ -0,0 +1,143 @@
+"""HTTP client shared by every network path in the integration.
+
+Requests go through Home Assistant's pooled ``aiohttp`` session so that
+connections to the council site are kept alive and reused instead of paying
+for a new TCP and TLS handshake on every fetch. A process-wide semaphore caps
+the number of requests in flight so that many roads refreshing together, as
+they do after a restart, queue up rather than hitting the council server at
+once.
+
+``async_fetch_stream`` hands a response body to the caller chunk by chunk
+instead of reading it whole, for callers that parse incrementally.
+"""
+import asyncio
+from dataclasses import dataclass, field
+import logging
+import time
+
+from aiohttp import ClientTimeout
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import (
+    DATA_FETCH_SEMAPHORE,
+    MAX_CONCURRENT_FETCHES,
+    REQUEST_CONNECT_TIMEOUT,
+    REQUEST_TIMEOUT,
+    STREAM_CHUNK_SIZE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = ClientTimeout(total=REQUEST_TIMEOUT, connect=REQUEST_CONNECT_TIMEOUT)
+DEFAULT_HEADERS = {"Accept-Encoding": "gzip, deflate"}
+
+
+def _fetch_semaphore(hass: HomeAssistant):
+    """Return the semaphore limiting concurrent requests to the council site."""
+    semaphore = hass.data.get(DATA_FETCH_SEMAPHORE)
+    if semaphore is None:
+        semaphore = hass.data[DATA_FETCH_SEMAPHORE] = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    return semaphore
+
+
+@dataclass
+class FetchResult:
+    """The outcome of a single request."""
+
+    url: str
+    status: int
+    body: bytes | None
+    headers: dict = field(default_factory=dict)
+    encoding: str | None = None
+    elapsed: float = 0.0
+    streamed: int = 0
+
+    @property
+    def ok(self):
+        """Return True if the request returned a body."""
+        return self.status == 200 and (self.body is not None or self.streamed > 0)
+
+    @property
+    def not_modified(self):
+        """Return True if a conditional request found the resource unchanged."""
+        return self.status == 304
+
+    @property
+    def size(self):
+        """Return the size of the decompressed body in bytes."""
+        return len(self.body) if self.body is not None else self.streamed
+
+    @property
+    def text(self):
+        """Return the body decoded as text."""
+        if self.body is None:
+            return None
+        return self.body.decode(self.encoding or "utf-8", errors="replace")
+
+
+async def async_fetch(hass: HomeAssistant, url, headers=None, timeout=DEFAULT_TIMEOUT):
+    """GET a URL with the shared session and return a FetchResult.
+
+    Only a 200 response has its body read; any other status is returned with
+    ``body`` set to None for the caller to handle.
+    """
+    session = async_get_clientsession(hass)
+    request_headers = {**DEFAULT_HEADERS, **(headers or {})}
+    async with _fetch_semaphore(hass):
+        start = time.monotonic()
+        async with session.get(url, headers=request_headers, timeout=timeout) as response:
+            body = None
+            encoding = None
+            if response.status == 200:
+                body = await response.read()
+                encoding = response.get_encoding()
+            result = FetchResult(
+                url=url,
+                status=response.status,
+                body=body,
+                headers=response.headers,
+                encoding=encoding,
+                elapsed=time.monotonic() - start,
+            )
+    _LOGGER.debug(
+        "GET %s: status %s, %s bytes in %.3fs", url, result.status, result.size, result.elapsed
+    )
+    return result
+
+
+async def async_fetch_stream(
+    hass: HomeAssistant, url, consume, headers=None, timeout=DEFAULT_TIMEOUT,
+    chunk_size=STREAM_CHUNK_SIZE,
+):
+    """GET a URL and pass a 200 response body to a consumer as it arrives.
+
+    ``await consume(chunk, encoding)`` is called for each decompressed chunk,
+    where encoding is the charset declared by the response or None. The body
+    is never held whole: the returned FetchResult has ``body`` set to None
+    and ``streamed`` set to the number of bytes consumed.
+    """
+    session = async_get_clientsession(hass)
+    request_headers = {**DEFAULT_HEADERS, **(headers or {})}
+    async with _fetch_semaphore(hass):
+        start = time.monotonic()
+        async with session.get(url, headers=request_headers, timeout=timeout) as response:
+            streamed = 0
+            if response.status == 200:
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    streamed += len(chunk)
+                    await consume(chunk, response.charset)
+            result = FetchResult(
+                url=url,
+                status=response.status,
+                body=None,
+                headers=response.headers,
+                encoding=response.charset,
+                elapsed=time.monotonic() - start,
+                streamed=streamed,
+            )
+    _LOGGER.debug(
+        "GET %s: status %s, %s bytes streamed in %.3fs",
+        url, result.status, result.size, result.elapsed,
+    )
+    return result
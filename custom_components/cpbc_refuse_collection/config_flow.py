@@ -1,14 +1,15 @@
 import logging
+import secrets
 from homeassistant import config_entries
 from homeassistant.core import callback
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN
-from .common import fetch_road_names_and_ids
+from .const import CONF_ICS_TOKEN, DOMAIN
+from .ics import ics_path
+from .roads import SEARCH_LIMIT, async_get_road_directory
 
 import voluptuous as vol
-from aiohttp import ClientSession
-from bs4 import BeautifulSoup
+
+_LOGGER = logging.getLogger(__name__)
 
 class CpbcRefuseCalendarConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for CPBC Refuse Collection Calendar."""
@@ -16,8 +17,29 @@ class CpbcRefuseCalendarConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
+    def __init__(self):
+        """Initialize the config flow."""
+        self._matches = []
+
     async def async_step_user(self, user_input=None):
-        """Handle a flow initiated by the user."""
+        """Handle a flow initiated by the user: search for a road."""
+        errors = {}
+
+        if user_input is not None:
+            road_index = await self._async_get_road_index()
+            self._matches, errors = _search_roads(road_index, user_input["search"])
+            if not errors:
+                return await self.async_step_select()
+
+        return self.async_show_form(
+            step_id="user",
+            data_schema=vol.Schema({vol.Required("search"): str}),
+            errors=errors,
+            description_placeholders={"limit": str(SEARCH_LIMIT)},
+        )
+
+    async def async_step_select(self, user_input=None):
+        """Select a road from the search results."""
         errors = {}
 
         if user_input is not None:
@@ -25,83 +47,113 @@ class CpbcRefuseCalendarConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             valid = await self._validate_input(user_input)
             if valid:
                 selected_road_id = user_input["road_id"]
-                selected_road_name = next(road_name for road_name, road_id in await fetch_road_names_and_ids() if road_id == selected_road_id)
+                selected_road_name = (await self._async_get_road_index()).name(selected_road_id)
 
                 # Here, save both the road_id and road_name in the configuration entry
                 return self.async_create_entry(
                     title="Castle Point Borough Council Refuse Collection Calendar",
-                    data={"road_id": selected_road_id, "road_name": selected_road_name}
+                    data={
+                        "road_id": selected_road_id,
+                        "road_name": selected_road_name,
+                        CONF_ICS_TOKEN: secrets.token_urlsafe(),
+                    }
                 )
             else:
                 errors["base"] = "invalid_input"
 
-        # Fetch road names and IDs from the web page
-        road_names_and_ids = await fetch_road_names_and_ids()
-
-        # Schema for the form
-        data_schema = vol.Schema({
-            vol.Required("road_id"): vol.In({road_id: road_name for road_name, road_id in road_names_and_ids}),
-        })
-
         return self.async_show_form(
-            step_id="user",
-            data_schema=data_schema,
-            errors=errors,
-        )
-
-        return self.async_show_form(
-            step_id="user",
-            data_schema=data_schema,
+            step_id="select",
+            data_schema=_select_schema(self._matches),
             errors=errors,
         )
 
     async def _validate_input(self, user_input):
         """Validate user input."""
-        road_id = user_input.get("road_id")
-        road_names_and_ids = await fetch_road_names_and_ids()
-        if road_id not in [road_id for _, road_id in road_names_and_ids]:
-            return False
-        return True
+        road_index = await self._async_get_road_index()
+        return user_input.get("road_id") in road_index
+
+    async def _async_get_road_index(self):
+        """Return the road index from the shared road directory."""
+        return await async_get_road_directory(self.hass).async_get_index()
 
     @staticmethod
     @callback
     def async_get_options_flow(config_entry):
         return CpbcRefuseCollectionCalendarOptionsFlow(config_entry)
-    
-    async def async_step_options(self, user_input=None):
-        """Handle options."""
-        _LOGGER.debug("User input for options: %s", user_input)
-        current_road_id = self.config_entry.data.get("road_id")
-        if user_input is not None:
-            selected_road_name = user_input.get("road_id")
-            new_road_id, new_road_name = next((road_id, road_name) for road_name, road_id in await fetch_road_names_and_ids() if road_name == selected_road_name)
-            if current_road_id != new_road_id:
-                # Update both road_id and road_name
-                return self.async_create_entry(title="", data={"road_id": new_road_id, "road_name": new_road_name})
-            # No change, return without creating a new entry
-            return self.async_abort(reason="road_id unchanged")
-        # Fetch road names and IDs from the web page
-        road_names_and_ids = await fetch_road_names_and_ids()
-        _LOGGER.debug("Showing options form with data: %s", road_names_and_ids)
-        return self.async_show_form(
-            step_id="options",
-            data_schema=vol.Schema({
-                vol.Required("road_id", default=current_road_id): vol.In([road[0] for road in road_names_and_ids]),
-            }, extra=vol.ALLOW_EXTRA),
-            description_placeholders={
-                "description": "Please select your road from the dropdown for options."
-            },
-        )
 
 class CpbcRefuseCollectionCalendarOptionsFlow(config_entries.OptionsFlow):
-    """Handle options for CPBC Refuse Collection Calendar."""
+    """Handle options for CPBC Refuse Collection Calendar: change the road."""
     def __init__(self, config_entry):
         """Initialize CPBC Refuse Collection Calendar options flow."""
         self.config_entry = config_entry
+        self._matches = []
 
     async def async_step_init(self, user_input=None):
-        """Manage the CPBC Refuse Collection Calendar options."""
+        """Search for the new road."""
+        _LOGGER.debug("User input for options: %s", user_input)
+        errors = {}
+        if user_input is not None:
+            road_index = await async_get_road_directory(self.hass).async_get_index()
+            self._matches, errors = _search_roads(road_index, user_input["search"])
+            if not errors:
+                return await self.async_step_select()
         return self.async_show_form(
             step_id="init",
-            data_schema=vol.Schema({}),
+            data_schema=vol.Schema({vol.Required("search"): str}),
+            errors=errors,
+            description_placeholders={
+                "road_name": self.config_entry.data.get("road_name", ""),
+                "limit": str(SEARCH_LIMIT),
+                "ics_path": ics_path(self.config_entry) or "",
+            },
         )
+
+    async def async_step_select(self, user_input=None):
+        """Select the new road from the search results."""
+        errors = {}
+        if user_input is not None:
+            new_road_id = user_input["road_id"]
+            road_index = await async_get_road_directory(self.hass).async_get_index()
+            if new_road_id not in road_index:
+                errors["base"] = "invalid_input"
+            elif new_road_id == self.config_entry.data.get("road_id"):
+                return self.async_abort(reason="road_id_unchanged")
+            else:
+                # The coordinator reads the road from the entry's data, so
+                # update it there and reload rather than storing an option
+                self.hass.config_entries.async_update_entry(
+                    self.config_entry,
+                    data={
+                        **self.config_entry.data,
+                        "road_id": new_road_id,
+                        "road_name": road_index.name(new_road_id),
+                    },
+                )
+                self.hass.config_entries.async_schedule_reload(self.config_entry.entry_id)
+                return self.async_create_entry(title="", data={})
+        return self.async_show_form(
+            step_id="select",
+            data_schema=_select_schema(self._matches),
+            errors=errors,
+        )
+
+
+def _search_roads(road_index, query):
+    """Return (matches, errors) for a road search.
+
+    A search matching more than SEARCH_LIMIT roads is refused rather than
+    cut short, so the user's road is never silently left off the list.
+    """
+    matches = road_index.search(query, limit=SEARCH_LIMIT + 1)
+    if not matches:
+        return [], {"base": "no_roads_found"}
+    if len(matches) > SEARCH_LIMIT:
+        return [], {"base": "too_many_roads"}
+    return matches, {}
+
+
+def _select_schema(matches):
+    """Return a schema offering only the search results, not the whole borough."""
+    return vol.Schema({
+        vol.Required("road_id"): vol.In({road_id: road_name for road_name, road_id in matches}),
+    })
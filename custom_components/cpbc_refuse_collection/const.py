@@ -1 +1,47 @@
+from datetime import timedelta
+
 DOMAIN = "cpbc_refuse_collection"
+
+PLATFORMS = ["calendar", "sensor", "binary_sensor"]
+
+CONF_ICS_TOKEN = "ics_token"
+DATA_ICS_TOKENS = f"{DOMAIN}_ics_tokens"
+
+DATA_COORDINATORS = f"{DOMAIN}_coordinators"
+DATA_FETCH_SEMAPHORE = f"{DOMAIN}_fetch_semaphore"
+MAX_CONCURRENT_FETCHES = 4
+
+SCHEDULE_STORAGE_KEY = DOMAIN + ".schedule_{road_id}"
+SCHEDULE_STORAGE_VERSION = 1
+
+MIN_UPDATE_INTERVAL = timedelta(days=1)
+MAX_UPDATE_INTERVAL = timedelta(days=7)
+MAX_PREDICTED_UPDATE_INTERVAL = timedelta(days=28)
+
+BASE_URL = "https://apps.castlepoint.gov.uk/cpapps/index.cfm"
+ROAD_LIST_URL = BASE_URL + "?fa=wastecalendar"
+
+DATA_ROAD_DIRECTORY = f"{DOMAIN}_road_directory"
+ROAD_DIRECTORY_STORAGE_KEY = f"{DOMAIN}.road_directory"
+ROAD_DIRECTORY_STORAGE_VERSION = 1
+ROAD_DIRECTORY_TTL = timedelta(days=1)
+ROAD_DIRECTORY_RETRY_BACKOFF = timedelta(minutes=10)
+
+DATA_ROAD_VALIDATOR = f"{DOMAIN}_road_validator"
+VALIDATION_INTERVAL = timedelta(days=7)
+VALIDATION_RETRY_DELAY = timedelta(minutes=15)
+
+DISPLAY_DETAILS_URL = BASE_URL + "?fa=wastecalendar.displayDetails&roadID={road_id}"
+
+DATA_DATASET = f"{DOMAIN}_dataset"
+DATASET_FILENAME = f"{DOMAIN}_dataset.json.gz"
+
+REQUEST_TIMEOUT = 30
+REQUEST_CONNECT_TIMEOUT = 10
+
+DATA_PARSE_EXECUTOR = f"{DOMAIN}_parse_executor"
+PARSE_MAX_WORKERS = 2
+PARSE_USE_PROCESSES = False
+PARSE_TIME_BUDGET = 10
+PARSE_TIMEOUT_GRACE = 1
+STREAM_CHUNK_SIZE = 64 * 1024
@@ -0,0 +1,428 @@
+import asyncio
+from dataclasses import asdict, dataclass
+import hashlib
+import logging
+from datetime import datetime, timedelta
+import os
+import time
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .client import async_fetch_stream
+from .crawler import Dataset
+from .events import CollectionSchedule, EventIndex
+from .const import (
+    DATA_COORDINATORS,
+    DATA_DATASET,
+    DATASET_FILENAME,
+    DISPLAY_DETAILS_URL,
+    MAX_PREDICTED_UPDATE_INTERVAL,
+    MAX_UPDATE_INTERVAL,
+    MIN_UPDATE_INTERVAL,
+    PARSE_TIME_BUDGET,
+    SCHEDULE_STORAGE_KEY,
+    SCHEDULE_STORAGE_VERSION,
+)
+from .parser import ScheduleStreamParser
+from .recurrence import RecurrenceModel
+from .state import DerivedStateEngine
+from .worker import async_get_parse_executor
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def async_get_coordinator_registry(hass: HomeAssistant):
+    """Return the coordinator registry shared by every entry."""
+    registry = hass.data.get(DATA_COORDINATORS)
+    if registry is None:
+        registry = hass.data[DATA_COORDINATORS] = CoordinatorRegistry(hass)
+    return registry
+
+
+async def async_get_dataset(hass: HomeAssistant):
+    """Return the crawled dataset from the config directory, or None.
+
+    The file is read once; later calls reuse the result, including a
+    missing or unreadable file.
+    """
+    if DATA_DATASET not in hass.data:
+        path = hass.config.path(DATASET_FILENAME)
+
+        def load():
+            if not os.path.exists(path):
+                return None
+            return Dataset.load(path)
+
+        try:
+            hass.data[DATA_DATASET] = await hass.async_add_executor_job(load)
+        except Exception as e:
+            _LOGGER.warning("Error loading schedule dataset %s: %s", path, e)
+            hass.data[DATA_DATASET] = None
+    return hass.data[DATA_DATASET]
+
+
+def snapshot_store(hass: HomeAssistant, road_id):
+    """Return the Store holding the last parsed schedule for a road."""
+    return Store(hass, SCHEDULE_STORAGE_VERSION, SCHEDULE_STORAGE_KEY.format(road_id=road_id))
+
+
+class CoordinatorRegistry:
+    """Share one coordinator between all config entries for the same road.
+
+    Coordinators are reference counted by the entries using them. The first
+    entry for a road creates the coordinator and starts it; later entries
+    wait on that same start rather than starting another, and the
+    coordinator is shut down when the last entry releases it. If the start
+    fails, the coordinator and every reference to it are dropped, so the
+    next entry for the road starts afresh.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize."""
+        self.hass = hass
+        self._coordinators = {}
+        self._first_refresh = {}
+        self._references = {}
+
+    def get(self, road_id):
+        """Return the coordinator for a road if one is running, else None."""
+        return self._coordinators.get(road_id)
+
+    async def async_acquire(self, road_id):
+        """Return the coordinator for a road, creating it if needed."""
+        coordinator = self._coordinators.get(road_id)
+        if coordinator is None:
+            coordinator = CpbcRefuseCollectionCalendarDataCoordinator(self.hass, road_id)
+            self._coordinators[road_id] = coordinator
+            self._first_refresh[road_id] = self.hass.async_create_task(self._async_start(coordinator))
+            _LOGGER.debug("Created coordinator for road ID: %s", road_id)
+        self._references[road_id] = self._references.get(road_id, 0) + 1
+        first_refresh = self._first_refresh[road_id]
+        try:
+            await asyncio.shield(first_refresh)
+        except Exception:
+            # Entries waiting on the same start fail with it; the first to
+            # get here drops them all
+            if self._first_refresh.get(road_id) is first_refresh:
+                _LOGGER.debug("Dropping coordinator for road ID %s after a failed start", road_id)
+                self._first_refresh.pop(road_id)
+                self._references.pop(road_id, None)
+                self._coordinators.pop(road_id, None)
+                await coordinator.async_shutdown()
+            raise
+        return coordinator
+
+    async def _async_start(self, coordinator):
+        """Seed a new coordinator, refreshing in the background if seeded.
+
+        The coordinator is seeded from its saved snapshot, or failing that
+        from the crawled dataset. With neither there is nothing to show yet,
+        so the first refresh is awaited as before.
+        """
+        if await coordinator.async_load_snapshot() or coordinator.load_dataset(
+            await async_get_dataset(self.hass)
+        ):
+            self.hass.async_create_task(coordinator.async_refresh())
+        else:
+            await coordinator.async_refresh()
+
+    async def async_release(self, road_id):
+        """Drop a reference to a road's coordinator, shutting it down on the last."""
+        references = self._references.get(road_id, 0) - 1
+        if references > 0:
+            self._references[road_id] = references
+            return
+        self._references.pop(road_id, None)
+        self._first_refresh.pop(road_id, None)
+        coordinator = self._coordinators.pop(road_id, None)
+        if coordinator is not None:
+            _LOGGER.debug("Shutting down coordinator for road ID: %s", road_id)
+            await coordinator.async_shutdown()
+
+
+@dataclass
+class RefreshMetrics:
+    """Cost and outcome of the coordinator's refreshes.
+
+    The ``last_*`` fields describe the most recent refresh; the counters
+    accumulate over the coordinator's lifetime. ``last_parse_time`` is the
+    wall time of the parse on the worker pool and ``last_loop_time`` the
+    time the refresh spent blocking the event loop. ``not_modified`` counts
+    304s, which skip the parse; ``unchanged`` counts 200s whose page hashed
+    the same as the last one, which are parsed but not rebuilt.
+    """
+
+    requests: int = 0
+    not_modified: int = 0
+    unchanged: int = 0
+    parsed: int = 0
+    failed: int = 0
+    last_fetch_latency: float | None = None
+    last_response_bytes: int | None = None
+    last_parse_time: float | None = None
+    last_loop_time: float | None = None
+    event_count: int = 0
+    last_success: datetime | None = None
+
+    @property
+    def hits(self):
+        """Return refreshes answered by a 304 from the council site."""
+        return self.not_modified
+
+    @property
+    def skipped_rebuilds(self):
+        """Return refreshes that did not need the schedule rebuilt."""
+        return self.not_modified + self.unchanged
+
+    @property
+    def seconds_since_success(self):
+        """Return the time since the last successful refresh, or None."""
+        if self.last_success is None:
+            return None
+        return (dt_util.utcnow() - self.last_success).total_seconds()
+
+    def as_dict(self):
+        """Return the metrics, including derived values, as a dict."""
+        return {
+            **asdict(self),
+            "hits": self.hits,
+            "skipped_rebuilds": self.skipped_rebuilds,
+            "seconds_since_success": self.seconds_since_success,
+        }
+
+
+class CpbcRefuseCollectionCalendarDataCoordinator(DataUpdateCoordinator):
+    """Class to manage fetching CPBC Refuse Collection Calendar data.
+
+    Refreshes are conditional: the ETag and Last-Modified of the last page
+    are sent back, and a 304 skips the parse. A 200 is streamed through an
+    incremental parser and hashed as it arrives, so the page is never held
+    whole; if it hashes the same as the last parsed page the schedule is not
+    rebuilt. The next refresh is scheduled from how far ahead the known
+    schedule runs.
+    """
+
+    def __init__(self, hass, road_id):
+        """Initialize."""
+        self.road_id = road_id
+        self._store = snapshot_store(hass, road_id)
+        self._data_version = 0
+        self._etag = None
+        self._last_modified = None
+        self._content_hash = None
+        self._agreements = 0
+        self.metrics = RefreshMetrics()
+        self.derived = DerivedStateEngine(self)
+        update_interval = MIN_UPDATE_INTERVAL
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="Castle Point Borough Council Refuse Collection Calendar",
+            update_method=self._async_update_data,
+            update_interval=update_interval,
+        )
+
+    def _build_data(self, records):
+        """Build coordinator data from (year, month, day, colour) records."""
+        self._data_version += 1
+        schedule = CollectionSchedule.from_records(records)
+        model = RecurrenceModel.fit(schedule)
+        return {
+            "schedule": schedule,
+            "model": model,
+            "index": EventIndex(schedule, self._data_version, model),
+        }
+
+    async def async_load_snapshot(self):
+        """Seed data from the last saved schedule. Return True if one was found."""
+        try:
+            snapshot = await self._store.async_load()
+        except Exception as e:
+            _LOGGER.warning("Error loading schedule snapshot for road ID %s: %s", self.road_id, e)
+            return False
+        if not snapshot or not snapshot.get("records"):
+            return False
+        self.data = self._build_data(snapshot["records"])
+        self._etag = snapshot.get("etag")
+        self._last_modified = snapshot.get("last_modified")
+        self._content_hash = snapshot.get("content_hash")
+        self.update_interval = self._next_update_interval(self.data["schedule"])
+        self.metrics.event_count = len(self.data["schedule"])
+        _LOGGER.debug(
+            "Loaded %s events for road ID %s from snapshot saved at %s",
+            len(self.data["schedule"]), self.road_id, snapshot.get("saved"),
+        )
+        return True
+
+    def load_dataset(self, dataset):
+        """Seed data from the crawled dataset. Return True if it has this road."""
+        records = dataset.records(self.road_id) if dataset else None
+        if not records:
+            return False
+        self.data = self._build_data(records)
+        self.update_interval = self._next_update_interval(self.data["schedule"])
+        self.metrics.event_count = len(self.data["schedule"])
+        _LOGGER.debug(
+            "Loaded %s events for road ID %s from dataset generated at %s",
+            len(self.data["schedule"]), self.road_id, dataset.generated,
+        )
+        return True
+
+    async def _async_save_snapshot(self, records):
+        """Persist the parsed schedule for the next startup."""
+        await self._store.async_save({
+            "records": records,
+            "etag": self._etag,
+            "last_modified": self._last_modified,
+            "content_hash": self._content_hash,
+            "saved": dt_util.utcnow().isoformat(),
+        })
+
+    def _next_update_interval(self, schedule):
+        """Return how long to wait before the next refresh.
+
+        A quarter of the time left on the known schedule, so a page that
+        runs months ahead is checked weekly and one close to running out is
+        checked daily. Each consecutive refresh that matched the recurrence
+        model's predictions doubles the interval, up to a limit, since the
+        model can answer queries past the scraped schedule.
+        """
+        if not schedule:
+            return MIN_UPDATE_INTERVAL
+        horizon = schedule.ordinals[-1] - dt_util.now().date().toordinal()
+        interval = max(MIN_UPDATE_INTERVAL, min(MAX_UPDATE_INTERVAL, timedelta(days=horizon // 4)))
+        if self._agreements:
+            interval = min(MAX_PREDICTED_UPDATE_INTERVAL, interval * 2 ** self._agreements)
+        return interval
+
+    def _conditional_headers(self):
+        """Return validators for a conditional request, if data is held."""
+        headers = {}
+        if self.data and len(self.data["schedule"]):
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+        return headers
+
+    def _stale_data(self, reason):
+        """Return the current data to serve while the site is failing, if any."""
+        if self.data and len(self.data["schedule"]):
+            _LOGGER.warning("Serving last known schedule for road ID %s: %s", self.road_id, reason)
+            return self.data
+        return None
+
+    async def _async_update_data(self):
+        """Fetch data."""
+        _LOGGER.debug("Coordinator update road ID: %s", self.road_id)
+        
+        try:
+            url = DISPLAY_DETAILS_URL.format(road_id=self.road_id)
+            _LOGGER.debug("Coordinator update URL: %s", url)
+            try:
+                self.metrics.requests += 1
+                executor = async_get_parse_executor(self.hass)
+                hasher = hashlib.sha256()
+                records = []
+                stream = None
+                parse_time = loop_time = 0.0
+
+                async def consume(chunk, encoding):
+                    nonlocal stream, parse_time, loop_time
+                    if stream is None:
+                        stream = ScheduleStreamParser(encoding)
+                    loop_start = time.perf_counter()
+                    hasher.update(chunk)
+                    loop_time += time.perf_counter() - loop_start
+                    parse_start = time.perf_counter()
+                    records.extend(await executor.async_feed(
+                        stream.feed_bytes, chunk, budget=PARSE_TIME_BUDGET - parse_time
+                    ))
+                    parse_time += time.perf_counter() - parse_start
+
+                result = await async_fetch_stream(
+                    self.hass, url, consume, headers=self._conditional_headers()
+                )
+                self.metrics.last_fetch_latency = result.elapsed
+                self.metrics.last_response_bytes = result.size
+                if result.not_modified and self.data:
+                    self.metrics.not_modified += 1
+                    self.metrics.last_parse_time = 0.0
+                    self.metrics.last_loop_time = 0.0
+                    _LOGGER.debug("Schedule for road ID %s not modified", self.road_id)
+                    return self._reuse_data()
+                if not result.ok:
+                    self.metrics.failed += 1
+                    _LOGGER.error("Error fetching data: URL: %s, Status: %s", url, result.status)
+                    return self._stale_data(f"status {result.status}") or self._build_data([])
+
+                parse_start = time.perf_counter()
+                records.extend(await executor.async_feed(
+                    stream.finish, budget=PARSE_TIME_BUDGET - parse_time
+                ))
+                self.metrics.last_parse_time = parse_time + time.perf_counter() - parse_start
+                self.metrics.last_loop_time = loop_time
+                content_hash = hasher.hexdigest()
+                if content_hash == self._content_hash and self.data:
+                    self.metrics.unchanged += 1
+                    _LOGGER.debug("Schedule for road ID %s unchanged, skipping rebuild", self.road_id)
+                    self._etag = result.headers.get("ETag")
+                    self._last_modified = result.headers.get("Last-Modified")
+                    return self._reuse_data()
+
+                self.metrics.parsed += 1
+                build_start = time.perf_counter()
+                data = self._build_data(records)
+                self.metrics.last_loop_time += time.perf_counter() - build_start
+                _LOGGER.debug(
+                    "Parsed %s collections for road ID %s in %.3fs, %.3fs on the event loop",
+                    len(data["schedule"]), self.road_id,
+                    self.metrics.last_parse_time, self.metrics.last_loop_time,
+                )
+                if records:
+                    self._etag = result.headers.get("ETag")
+                    self._last_modified = result.headers.get("Last-Modified")
+                    self._content_hash = content_hash
+                    await self._async_save_snapshot(records)
+                self._update_agreements(data)
+                self._record_success(data)
+                return data
+            except Exception as e:
+                self.metrics.failed += 1
+                _LOGGER.error("Error fetching data: URL: %s, Exception: %s", url, e)
+                stale = self._stale_data(e)
+                if stale is not None:
+                    return stale
+                raise UpdateFailed(f"Error updating data: {e}")        
+        except Exception as e:
+            raise UpdateFailed(f"Error updating data: {e}")
+
+    def _update_agreements(self, data):
+        """Count how many pages in a row the held model predicted.
+
+        Only called when a page brings new records; a 304 or an unchanged
+        page says nothing new about the model.
+        """
+        model = self.data["model"] if self.data else None
+        if model is not None and len(data["schedule"]) and model.agrees(data["schedule"]):
+            self._agreements += 1
+        else:
+            self._agreements = 0
+
+    def _record_success(self, data):
+        """Record a successful refresh and schedule the next one."""
+        self.metrics.event_count = len(data["schedule"])
+        self.metrics.last_success = dt_util.utcnow()
+        self.update_interval = self._next_update_interval(data["schedule"])
+
+    def _reuse_data(self):
+        """Return the held data for a refresh that found no change."""
+        self._record_success(self.data)
+        return self.data
+
+    async def async_get_events(self, hass, start_date, end_date):
+        """Return calendar events within a datetime range."""
+        return self.data["index"].calendar_events_between(start_date, end_date)
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""Borough-wide crawler producing an offline schedule dataset.
+
+Runs without a Home Assistant instance:
+
+    python -m custom_components.cpbc_refuse_collection.crawler -o dataset.json.gz
+
+Every road in the road list is fetched with bounded concurrency and a
+minimum spacing between requests, so the council site sees at most
+``--rate`` requests a second. Collection rounds are shared between roads, so
+most roads have identical schedules; each distinct schedule is stored once
+as a schedule group and roads refer to it by index.
+
+The dataset is gzip-compressed JSON:
+
+    {
+        "version": 1,
+        "generated": "<ISO timestamp>",
+        "roads": {"<road_id>": ["<road name>", <group>], ...},
+        "groups": [{"start": <ordinal>, "deltas": [...], "colours": "0101..."}, ...]
+    }
+
+Dates are stored as a first date ordinal followed by day deltas, and
+colours as one digit per collection (0 black, 1 pink). Placed in the Home
+Assistant config directory as ``cpbc_refuse_collection_dataset.json.gz``,
+it seeds any road that has no saved snapshot without a live request.
+"""
+import argparse
+from array import array
+import asyncio
+from datetime import date
+import gzip
+import json
+import logging
+import sys
+import time
+
+from aiohttp import ClientSession, ClientTimeout
+
+from .const import BASE_URL, REQUEST_CONNECT_TIMEOUT, REQUEST_TIMEOUT
+from .parser import COLOURS, encode_records, parse_collection_schedule, parse_road_names_and_ids
+
+_LOGGER = logging.getLogger(__name__)
+
+DATASET_VERSION = 1
+
+
+class RateLimiter:
+    """Space the start of successive requests at least interval seconds apart."""
+
+    def __init__(self, rate):
+        """Initialize with a maximum number of requests per second."""
+        self._interval = 1 / rate if rate else 0
+        self._lock = asyncio.Lock()
+        self._next = 0.0
+
+    async def wait(self):
+        """Wait until the next request may start."""
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self._interval
+
+
+class Dataset:
+    """Road schedules grouped by identical schedule.
+
+    Each group is a pair of sorted date ordinals and matching colour codes,
+    the same encoding CollectionSchedule uses, so this module needs nothing
+    from Home Assistant.
+    """
+
+    def __init__(self, roads=None, groups=None, generated=None):
+        """Initialize from {road_id: (road_name, group)} and a list of (ordinals, codes)."""
+        self.roads = roads or {}
+        self.groups = groups or []
+        self.generated = generated
+
+    def records(self, road_id):
+        """Return a road's (year, month, day, colour) records, or None."""
+        road = self.roads.get(road_id)
+        if road is None:
+            return None
+        records = []
+        for ordinal, code in zip(*self.groups[road[1]]):
+            day = date.fromordinal(ordinal)
+            records.append((day.year, day.month, day.day, COLOURS[code]))
+        return records
+
+    def as_dict(self):
+        """Return the dataset in its serialised form."""
+        groups = []
+        for ordinals, codes in self.groups:
+            ordinals = list(ordinals)
+            groups.append({
+                "start": ordinals[0] if ordinals else 0,
+                "deltas": [later - earlier for earlier, later in zip(ordinals, ordinals[1:])],
+                "colours": "".join(str(code) for code in codes),
+            })
+        return {
+            "version": DATASET_VERSION,
+            "generated": self.generated,
+            "roads": {road_id: [name, group] for road_id, (name, group) in self.roads.items()},
+            "groups": groups,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a dataset from its serialised form."""
+        if data.get("version") != DATASET_VERSION:
+            raise ValueError(f"Unsupported dataset version: {data.get('version')}")
+        groups = []
+        for group in data["groups"]:
+            ordinals = [group["start"]] if group["colours"] else []
+            for delta in group["deltas"]:
+                ordinals.append(ordinals[-1] + delta)
+            groups.append((array("i", ordinals), bytes(int(code) for code in group["colours"])))
+        roads = {road_id: (name, group) for road_id, (name, group) in data["roads"].items()}
+        return cls(roads, groups, data.get("generated"))
+
+    def save(self, path):
+        """Write the dataset to a gzip-compressed JSON file."""
+        with gzip.open(path, "wt", encoding="utf-8") as dataset_file:
+            json.dump(self.as_dict(), dataset_file, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        """Read a dataset written by save()."""
+        with gzip.open(path, "rt", encoding="utf-8") as dataset_file:
+            return cls.from_dict(json.load(dataset_file))
+
+
+async def _fetch_text(session, limiter, url, retries=2):
+    """GET a page as text, retrying transient failures."""
+    for attempt in range(retries + 1):
+        await limiter.wait()
+        try:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                return await response.text()
+        except Exception as e:
+            if attempt == retries:
+                raise
+            _LOGGER.debug("Retrying %s after error: %s", url, e)
+            await asyncio.sleep(2 ** attempt)
+
+
+async def crawl(base_url=BASE_URL, concurrency=4, rate=2.0, limit=None):
+    """Fetch every road's schedule and return a de-duplicated Dataset."""
+    limiter = RateLimiter(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    timeout = ClientTimeout(total=REQUEST_TIMEOUT, connect=REQUEST_CONNECT_TIMEOUT)
+    dataset = Dataset(generated=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+    group_by_key = {}
+
+    async with ClientSession(timeout=timeout) as session:
+        road_list = await _fetch_text(session, limiter, f"{base_url}?fa=wastecalendar")
+        roads = [(name, road_id) for name, road_id in parse_road_names_and_ids(road_list) if road_id]
+        if limit is not None:
+            roads = roads[:limit]
+        _LOGGER.info("Crawling %s roads", len(roads))
+
+        async def crawl_road(road_name, road_id):
+            url = f"{base_url}?fa=wastecalendar.displayDetails&roadID={road_id}"
+            async with semaphore:
+                try:
+                    html = await _fetch_text(session, limiter, url)
+                except Exception as e:
+                    _LOGGER.warning("Skipping road %s (%s): %s", road_id, road_name, e)
+                    return
+            try:
+                ordinals, codes = encode_records(parse_collection_schedule(html))
+            except Exception as e:
+                _LOGGER.warning("Skipping road %s (%s), page could not be parsed: %s", road_id, road_name, e)
+                return
+            ordinals = array("i", ordinals)
+            key = (ordinals.tobytes(), codes)
+            group = group_by_key.get(key)
+            if group is None:
+                group = group_by_key[key] = len(dataset.groups)
+                dataset.groups.append((ordinals, codes))
+            dataset.roads[road_id] = (road_name, group)
+
+        await asyncio.gather(*(crawl_road(road_name, road_id) for road_name, road_id in roads))
+
+    _LOGGER.info(
+        "Crawled %s roads into %s schedule groups", len(dataset.roads), len(dataset.groups)
+    )
+    return dataset
+
+
+def main(argv=None):
+    """Crawl the borough from the command line."""
+    parser = argparse.ArgumentParser(description="Crawl every CPBC road's collection schedule.")
+    parser.add_argument("-o", "--output", default="cpbc_refuse_collection_dataset.json.gz")
+    parser.add_argument("--base-url", default=BASE_URL, help="council calendar URL, e.g. a local stand-in")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight at once")
+    parser.add_argument("--rate", type=float, default=2.0, help="maximum requests per second")
+    parser.add_argument("--limit", type=int, help="only crawl the first N roads")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    dataset = asyncio.run(crawl(args.base_url, args.concurrency, args.rate, args.limit))
+    dataset.save(args.output)
+    print(f"Wrote {len(dataset.roads)} roads in {len(dataset.groups)} schedule groups to {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
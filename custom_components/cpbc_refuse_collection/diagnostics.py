@@ -0,0 +1,26 @@
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry):
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    schedule = coordinator.data["schedule"] if coordinator.data else None
+    return {
+        "entry": {
+            "road_id": entry.data.get("road_id"),
+            "road_name": entry.data.get("road_name"),
+        },
+        "coordinator": {
+            "update_interval": coordinator.update_interval.total_seconds(),
+            "last_update_success": coordinator.last_update_success,
+            "metrics": coordinator.metrics.as_dict(),
+        },
+        "schedule": {
+            "collections": len(schedule) if schedule else 0,
+            "first": schedule[0].date if schedule else None,
+            "last": schedule[-1].date if schedule else None,
+        },
+    }
@@ -0,0 +1,29 @@
+"""Base entity for entities showing a road's derived state."""
+from homeassistant.helpers.entity import Entity
+
+
+class CpbcRefuseCollectionDerivedEntity(Entity):
+    """An entity updated by push from its road's DerivedStateEngine."""
+
+    _attr_should_poll = False
+
+    def __init__(self, coordinator):
+        """Initialize."""
+        self.coordinator = coordinator
+
+    @property
+    def derived(self):
+        """Return the road's current DerivedState."""
+        return self.coordinator.derived.state
+
+    @property
+    def available(self):
+        """Return True if the coordinator's last update succeeded."""
+        return self.coordinator.last_update_success
+
+    async def async_added_to_hass(self):
+        """Start receiving state changes."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.derived.async_add_listener(self.async_write_ha_state)
+        )
@@ -0,0 +1,236 @@
+"""Compact storage and indexed lookup of collection events.
+
+A schedule is held as two parallel arrays: the collection dates as
+proleptic Gregorian ordinals in an ``array('i')`` and the bin colours as one
+byte each. A collection costs five bytes instead of a dict holding two aware
+datetimes and two strings, which matters when many roads and several years
+of history are held in one process. ``Collection`` views are created on
+demand when a caller needs a single event.
+"""
+from array import array
+from bisect import bisect_left
+from datetime import date, timedelta
+
+from homeassistant.components.calendar import CalendarEvent
+from homeassistant.util.dt import as_local, as_utc, start_of_local_day
+
+from .parser import COLOURS, encode_records
+
+SUMMARY = "CPBC Refuse Collection"
+COLLECTION_DURATION = timedelta(hours=13)
+
+
+
+class Collection:
+    """A single collection, viewed from a CollectionSchedule."""
+
+    __slots__ = ("ordinal", "code")
+
+    summary = SUMMARY
+
+    def __init__(self, ordinal, code):
+        """Initialize."""
+        self.ordinal = ordinal
+        self.code = code
+
+    def __repr__(self):
+        """Return a readable representation."""
+        return f"Collection({self.date.isoformat()}, {self.colour})"
+
+    @property
+    def date(self):
+        """Return the collection date."""
+        return date.fromordinal(self.ordinal)
+
+    @property
+    def colour(self):
+        """Return the bin colour, 'black' or 'pink'."""
+        return COLOURS[self.code]
+
+    @property
+    def description(self):
+        """Return the event description, which is the bin colour."""
+        return self.colour
+
+    @property
+    def start(self):
+        """Return the start of the collection day in UTC."""
+        return as_utc(start_of_local_day(self.date))
+
+    @property
+    def end(self):
+        """Return the end of the collection window in UTC."""
+        return self.start + COLLECTION_DURATION
+
+
+class CollectionSchedule:
+    """Immutable, date-sorted schedule of collections."""
+
+    __slots__ = ("_ordinals", "_codes")
+
+    def __init__(self, ordinals=(), codes=b""):
+        """Initialize from sorted ordinals and matching colour codes."""
+        self._ordinals = array("i", ordinals)
+        self._codes = bytes(codes)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a schedule from (year, month, day, colour) records.
+
+        Records are sorted by date; if a date appears more than once the
+        first record for it wins.
+        """
+        return cls(*encode_records(records))
+
+    def to_records(self):
+        """Return the schedule as (year, month, day, colour) records."""
+        records = []
+        for ordinal, code in zip(self._ordinals, self._codes):
+            day = date.fromordinal(ordinal)
+            records.append((day.year, day.month, day.day, COLOURS[code]))
+        return records
+
+    @property
+    def ordinals(self):
+        """Return the sorted date ordinals."""
+        return self._ordinals
+
+    def __len__(self):
+        """Return the number of collections."""
+        return len(self._ordinals)
+
+    def __getitem__(self, position):
+        """Return a Collection view for a position."""
+        return Collection(self._ordinals[position], self._codes[position])
+
+    def __iter__(self):
+        """Iterate over Collection views in date order."""
+        for ordinal, code in zip(self._ordinals, self._codes):
+            yield Collection(ordinal, code)
+
+    def __eq__(self, other):
+        """Return True if both schedules hold the same collections."""
+        if not isinstance(other, CollectionSchedule):
+            return NotImplemented
+        return self._ordinals == other._ordinals and self._codes == other._codes
+
+    __hash__ = None
+
+
+class EventIndex:
+    """Indexed lookups over a CollectionSchedule.
+
+    Built once per coordinator refresh. Next-event and range lookups are
+    answered by bisecting the sorted date ordinals, and the
+    ``CalendarEvent`` for each collection is created at most once per index,
+    so repeated state reads and calendar queries do no per-event work.
+
+    When given a fitted recurrence model, lookups past the last scraped
+    collection are answered from the model's predictions.
+    """
+
+    __slots__ = ("version", "schedule", "model", "_calendar_events")
+
+    def __init__(self, schedule, version=0, model=None):
+        """Initialize."""
+        self.version = version
+        self.schedule = schedule
+        self.model = model
+        self._calendar_events = [None] * len(schedule)
+
+    def __len__(self):
+        """Return the number of scraped events."""
+        return len(self.schedule)
+
+    def __iter__(self):
+        """Iterate over the scraped collections in date order."""
+        return iter(self.schedule)
+
+    def _first_starting_at_or_after(self, moment):
+        """Return the position of the first collection starting at or after moment."""
+        ordinals = self.schedule.ordinals
+        position = bisect_left(ordinals, as_local(moment).date().toordinal())
+        if position < len(ordinals) and self.schedule[position].start < moment:
+            position += 1
+        return position
+
+    def _predictions_from(self, moment):
+        """Yield predicted collections after the scraped ones, from moment's date."""
+        if self.model is None:
+            return iter(())
+        ordinals = self.schedule.ordinals
+        first = as_local(moment).date().toordinal()
+        if ordinals:
+            first = max(first, ordinals[-1] + 1)
+        return self.model.iter_from(first)
+
+    def next_event(self, now):
+        """Return the first collection starting at or after now, or None."""
+        position = self._first_starting_at_or_after(now)
+        if position < len(self.schedule):
+            return self.schedule[position]
+        for collection in self._predictions_from(now):
+            if collection.start >= now:
+                return collection
+        return None
+
+    def upcoming(self, now):
+        """Yield the collections that have not yet ended at now, in date order."""
+        ordinals = self.schedule.ordinals
+        position = bisect_left(ordinals, as_local(now).date().toordinal())
+        if position < len(ordinals) and self.schedule[position].end < now:
+            position += 1
+        for position in range(position, len(ordinals)):
+            yield self.schedule[position]
+        for collection in self._predictions_from(now):
+            if collection.end >= now:
+                yield collection
+
+    def current_event(self, now):
+        """Return the first collection that has not yet ended, or None."""
+        return next(self.upcoming(now), None)
+
+    def calendar_event(self, position):
+        """Return the CalendarEvent for the collection at a position."""
+        calendar_event = self._calendar_events[position]
+        if calendar_event is None:
+            calendar_event = self._calendar_events[position] = _calendar_event(
+                self.schedule[position]
+            )
+        return calendar_event
+
+    def next_calendar_event(self, now):
+        """Return the CalendarEvent for the first collection starting at or after now."""
+        position = self._first_starting_at_or_after(now)
+        if position < len(self.schedule):
+            return self.calendar_event(position)
+        collection = self.next_event(now)
+        if collection is not None:
+            return _calendar_event(collection, predicted=True)
+        return None
+
+    def calendar_events_between(self, start, end):
+        """Return CalendarEvents for the collections starting in [start, end)."""
+        events = [
+            self.calendar_event(position)
+            for position in range(
+                self._first_starting_at_or_after(start), self._first_starting_at_or_after(end)
+            )
+        ]
+        for collection in self._predictions_from(start):
+            if collection.start >= end:
+                break
+            if collection.start >= start:
+                events.append(_calendar_event(collection, predicted=True))
+        return events
+
+
+def _calendar_event(collection, predicted=False):
+    """Return a CalendarEvent for a collection."""
+    return CalendarEvent(
+        summary=f"{collection.summary} (predicted)" if predicted else collection.summary,
+        start=collection.start,
+        end=collection.end,
+        location="",
+        description=collection.description,
+    )
@@ -0,0 +1,112 @@
+"""iCalendar feed of each configured road's collections.
+
+``/api/cpbc_refuse_collection/<token>.ics`` serves an entry's schedule as an
+iCalendar feed for phones and shared calendars. The token is a random
+secret generated for each entry, so the URL cannot be guessed from the
+public road ID, and it is shown only in the entry's options dialog, which
+only administrators can open. The feed is rendered at most once per event index the
+coordinator publishes into an immutable bytes buffer with an ETag. Requests
+against an unchanged index reuse that buffer, and clients that send a
+matching ``If-None-Match`` get a bodiless 304.
+"""
+from datetime import timedelta
+import hashlib
+from http import HTTPStatus
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_ICS_TOKEN, DATA_ICS_TOKENS, DOMAIN
+from .events import SUMMARY
+
+ICS_URL = "/api/" + DOMAIN + "/{token}.ics"
+ICS_CONTENT_TYPE = "text/calendar"
+ICS_MAX_AGE = 3600
+
+
+def ics_path(entry):
+    """Return the path of an entry's feed, or None if it has no token yet."""
+    token = entry.data.get(CONF_ICS_TOKEN)
+    return ICS_URL.format(token=token) if token else None
+
+
+class IcsFeed:
+    """A rendered feed for one event index."""
+
+    __slots__ = ("index", "body", "etag")
+
+    def __init__(self, index, body):
+        """Initialize."""
+        self.index = index
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def render_ics(schedule, road_id):
+    """Render a CollectionSchedule as iCalendar bytes."""
+    stamp = dt_util.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:-//{DOMAIN}//{road_id}//EN",
+        "CALSCALE:GREGORIAN",
+        "X-WR-CALNAME:Castle Point Refuse Collection",
+    ]
+    for collection in schedule:
+        day = collection.date
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{road_id}-{day.isoformat()}@{DOMAIN}",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART;VALUE=DATE:{day.strftime('%Y%m%d')}",
+            f"DTEND;VALUE=DATE:{(day + timedelta(days=1)).strftime('%Y%m%d')}",
+            f"SUMMARY:{SUMMARY} ({collection.colour})",
+            f"DESCRIPTION:{collection.description}",
+            "TRANSP:TRANSPARENT",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(lines) + "\r\n").encode()
+
+
+class CpbcRefuseCollectionIcsView(HomeAssistantView):
+    """Serve an entry's collections as an iCalendar feed.
+
+    Calendar apps cannot send Home Assistant credentials, so the view does
+    not require authentication; the entry's secret token in the URL stands
+    in for it. Tokens are looked up in the map of set-up entries kept in
+    ``hass.data``; unknown tokens get a 404.
+    """
+
+    url = ICS_URL
+    name = f"api:{DOMAIN}:ics"
+    requires_auth = False
+
+    def __init__(self):
+        """Initialize."""
+        self._feeds = {}
+
+    def _feed(self, token, coordinator):
+        """Return the feed for a coordinator's current data, rendering if stale."""
+        index = coordinator.data["index"]
+        feed = self._feeds.get(token)
+        if feed is None or feed.index is not index:
+            feed = self._feeds[token] = IcsFeed(
+                index, render_ics(index.schedule, coordinator.road_id)
+            )
+        return feed
+
+    async def get(self, request, token):
+        """Return the feed, or 304 if the client's copy is current."""
+        hass = request.app["hass"]
+        entry_id = hass.data.get(DATA_ICS_TOKENS, {}).get(token)
+        coordinator = hass.data.get(DOMAIN, {}).get(entry_id, {}).get("coordinator")
+        if coordinator is None or not coordinator.data:
+            self._feeds.pop(token, None)
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+        feed = self._feed(token, coordinator)
+        headers = {"ETag": feed.etag, "Cache-Control": f"private, max-age={ICS_MAX_AGE}"}
+        if request.headers.get("If-None-Match") == feed.etag:
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+        return web.Response(body=feed.body, content_type=ICS_CONTENT_TYPE, headers=headers)
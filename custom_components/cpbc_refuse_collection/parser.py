@@ -0,0 +1,354 @@
+"""Parse the Castle Point Borough Council waste calendar pages.
+
+The ``displayDetails`` page renders each month as a ``calendarContainer``
+holding an ``<h2>Month Year</h2>`` heading and a table in which collection
+days are ``<td>`` cells classed ``normal`` (black bin) or ``pink`` (pink
+bin). The same month can be rendered more than once on a page; only the
+first rendering of each ``(month, year)`` is read.
+
+The coordinator's refreshes use ``ScheduleStreamParser``, built on the
+standard library's ``html.parser``. It is fed the response body chunk by
+chunk and keeps only the container it is currently inside, so memory stays
+flat however large the page is and no optional dependency is needed.
+
+``parse_collection_schedule`` parses a page held whole, for the borough
+crawler and the tests. It walks the document once with one of three
+backends, picked in order of speed when installed: ``selectolax`` (Lexbor
+bindings, no BeautifulSoup tree at all), ``lxml`` driven through
+BeautifulSoup, and the pure-Python ``html.parser`` that ships with
+BeautifulSoup and is always available.
+"""
+import calendar
+import codecs
+from datetime import date
+from html.parser import HTMLParser
+import logging
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ParseTimeout(Exception):
+    """Raised when parsing runs past its deadline."""
+
+BACKEND_SELECTOLAX = "selectolax"
+BACKEND_LXML = "lxml"
+BACKEND_HTML_PARSER = "html.parser"
+
+BACKENDS = (BACKEND_SELECTOLAX, BACKEND_LXML, BACKEND_HTML_PARSER)
+
+COLOUR_BLACK = "black"
+COLOUR_PINK = "pink"
+
+COLOURS = (COLOUR_BLACK, COLOUR_PINK)
+_COLOUR_CODES = {colour: code for code, colour in enumerate(COLOURS)}
+
+_MONTHS = {name: index for index, name in enumerate(calendar.month_name) if name}
+_HEADING_RE = re.compile(r"(?P<month>[A-Za-z]+)\s+(?P<year>\d{4})")
+_DAY_RE = re.compile(r"\d+")
+
+
+def _backend_available(backend):
+    """Return True when the given parser backend can be imported."""
+    try:
+        if backend == BACKEND_SELECTOLAX:
+            import selectolax.lexbor  # noqa: F401
+        elif backend == BACKEND_LXML:
+            import lxml  # noqa: F401
+        elif backend != BACKEND_HTML_PARSER:
+            return False
+    except ImportError:
+        return False
+    return True
+
+
+def select_backend(preferred=None):
+    """Return the preferred backend if installed, else the fastest available."""
+    if preferred is not None:
+        if _backend_available(preferred):
+            return preferred
+        _LOGGER.warning("Parser backend %s is not available, falling back", preferred)
+    for backend in BACKENDS:
+        if _backend_available(backend):
+            return backend
+    return BACKEND_HTML_PARSER
+
+
+def _parse_heading(text):
+    """Return (month, year) from a heading such as 'January 2024', or None."""
+    match = _HEADING_RE.search(text or "")
+    if match is None:
+        return None
+    month = _MONTHS.get(match.group("month").capitalize())
+    if month is None:
+        return None
+    return month, int(match.group("year"))
+
+
+def _parse_cell(classes, text):
+    """Return (day, colour) for a collection cell, or None."""
+    if "pink" in classes:
+        colour = COLOUR_PINK
+    elif "normal" in classes:
+        colour = COLOUR_BLACK
+    else:
+        return None
+    match = _DAY_RE.search(text)
+    if match is None:
+        return None
+    return int(match.group()), colour
+
+
+def _month_records(year, month, cells):
+    """Return (year, month, day, colour) records for a month's (day, colour) cells.
+
+    Cells whose day does not exist in the month are dropped, so one bad cell
+    cannot fail the whole page.
+    """
+    records = []
+    for day, colour in cells:
+        try:
+            date(year, month, day)
+        except ValueError:
+            _LOGGER.debug("Skipping invalid collection date %s-%s-%s", year, month, day)
+            continue
+        records.append((year, month, day, colour))
+    return records
+
+
+def _containers_soup(html, features):
+    """Yield (heading text, container) pairs using BeautifulSoup."""
+    soup = BeautifulSoup(html, features)
+    for container in soup.find_all(class_="calendarContainer"):
+        heading = container.find("h2")
+        if heading is not None:
+            yield heading.get_text(), container
+
+
+def _cells_soup(container):
+    """Yield (classes, text) for the collection cells of a container."""
+    for cell in container.find_all("td", class_=["pink", "normal"]):
+        yield cell.get("class", []), cell.get_text()
+
+
+def _containers_selectolax(html):
+    """Yield (heading text, container) pairs using selectolax."""
+    from selectolax.lexbor import LexborHTMLParser
+
+    for container in LexborHTMLParser(html).css(".calendarContainer"):
+        heading = container.css_first("h2")
+        if heading is not None:
+            yield heading.text(), container
+
+
+def _cells_selectolax(container):
+    """Yield (classes, text) for the collection cells of a container."""
+    for cell in container.css("td.pink, td.normal"):
+        yield (cell.attributes.get("class") or "").split(), cell.text()
+
+
+def encode_records(records):
+    """Return (sorted date ordinals, colour code bytes) for collection records.
+
+    Takes ``(year, month, day, colour)`` records; if a date appears more than
+    once the first record for it wins, and records that are not real dates
+    are dropped. Colour codes index ``COLOURS``.
+    """
+    collections = {}
+    for year, month, day, colour in records:
+        try:
+            ordinal = date(year, month, day).toordinal()
+        except ValueError:
+            _LOGGER.debug("Skipping invalid collection date %s-%s-%s", year, month, day)
+            continue
+        if ordinal not in collections:
+            collections[ordinal] = _COLOUR_CODES[colour]
+    ordinals = sorted(collections)
+    return ordinals, bytes(collections[ordinal] for ordinal in ordinals)
+
+
+def parse_collection_schedule(html, backend=None, deadline=None):
+    """Return the collections on a displayDetails page.
+
+    Returns a list of ``(year, month, day, colour)`` tuples in page order,
+    where colour is ``"black"`` or ``"pink"``. Months rendered more than once
+    are only read the first time they are seen. If a ``time.monotonic()``
+    deadline is given, ParseTimeout is raised once it passes.
+    """
+    backend = select_backend(backend)
+    if backend == BACKEND_SELECTOLAX:
+        containers, cells = _containers_selectolax(html), _cells_selectolax
+    else:
+        containers, cells = _containers_soup(html, backend), _cells_soup
+
+    months = {}
+    for heading, container in containers:
+        if deadline is not None and time.monotonic() > deadline:
+            raise ParseTimeout("Parsing the schedule page ran past its time budget")
+        key = _parse_heading(heading)
+        if key is None:
+            _LOGGER.debug("Skipping calendar month with heading: %s", heading)
+            continue
+        if key in months:
+            continue
+        month, year = key
+        parsed = (_parse_cell(classes, text) for classes, text in cells(container))
+        months[key] = _month_records(year, month, [cell for cell in parsed if cell is not None])
+
+    return [collection for collections in months.values() for collection in collections]
+
+
+class ScheduleStreamParser(HTMLParser):
+    """Incremental parser for the displayDetails page.
+
+    Collections are gathered for the ``calendarContainer`` being read and
+    released when it closes: kept if its heading names a month not seen
+    before, dropped otherwise. The only state carried between containers is
+    the set of months already read.
+    """
+
+    def __init__(self, encoding=None):
+        """Initialize with the encoding of the bytes that will be fed."""
+        super().__init__(convert_charrefs=True)
+        self._decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        self._seen = set()
+        self._ready = []
+        self._container_tag = None
+        self._depth = 0
+        self._heading = None
+        self._heading_text = None
+        self._collections = []
+        self._cell_classes = None
+        self._cell_text = []
+
+    def handle_starttag(self, tag, attrs):
+        """Track the container, its heading and its collection cells."""
+        if self._container_tag is None:
+            if "calendarContainer" in (dict(attrs).get("class") or "").split():
+                self._container_tag = tag
+                self._depth = 1
+            return
+        if tag == self._container_tag:
+            self._depth += 1
+        elif tag == "h2" and self._heading is None and self._heading_text is None:
+            self._heading_text = []
+        elif tag in ("td", "tr", "table"):
+            self._end_cell()
+            if tag == "td":
+                self._cell_classes = (dict(attrs).get("class") or "").split()
+
+    def handle_endtag(self, tag):
+        """Close cells, the heading and the container."""
+        if self._container_tag is None:
+            return
+        if tag == self._container_tag:
+            self._depth -= 1
+            if self._depth == 0:
+                self._end_container()
+        elif tag == "h2" and self._heading_text is not None:
+            self._heading = "".join(self._heading_text)
+            self._heading_text = None
+        elif tag in ("td", "tr", "table"):
+            self._end_cell()
+
+    def handle_data(self, data):
+        """Collect heading and cell text."""
+        if self._heading_text is not None:
+            self._heading_text.append(data)
+        if self._cell_classes is not None:
+            self._cell_text.append(data)
+
+    def _end_cell(self):
+        """Record the open cell if it is a collection."""
+        if self._cell_classes is None:
+            return
+        cell = _parse_cell(self._cell_classes, "".join(self._cell_text))
+        if cell is not None:
+            self._collections.append(cell)
+        self._cell_classes = None
+        self._cell_text = []
+
+    def _end_container(self):
+        """Release the container's collections and forget its markup."""
+        self._end_cell()
+        if self._heading_text is not None:
+            self._heading = "".join(self._heading_text)
+        key = _parse_heading(self._heading) if self._heading is not None else None
+        if key is None:
+            if self._heading is not None:
+                _LOGGER.debug("Skipping calendar month with heading: %s", self._heading)
+        elif key not in self._seen:
+            self._seen.add(key)
+            month, year = key
+            self._ready.extend(_month_records(year, month, self._collections))
+        self._container_tag = None
+        self._heading = None
+        self._heading_text = None
+        self._collections = []
+
+    def _take(self):
+        """Return and clear the collections released so far."""
+        ready, self._ready = self._ready, []
+        return ready
+
+    def feed_bytes(self, chunk, deadline=None):
+        """Feed a chunk of the body and return the collections it completed.
+
+        Raises ParseTimeout once a ``time.monotonic()`` deadline has passed.
+        """
+        if deadline is not None and time.monotonic() > deadline:
+            raise ParseTimeout("Parsing the schedule page ran past its time budget")
+        self.feed(self._decoder.decode(chunk))
+        return self._take()
+
+    def finish(self, deadline=None):
+        """Flush the parser and return the remaining collections.
+
+        A container left open by truncated markup is read as if it closed at
+        the end of the page.
+        """
+        self.feed(self._decoder.decode(b"", final=True))
+        self.close()
+        if self._container_tag is not None:
+            self._end_container()
+        return self._take()
+
+
+def iter_schedule_records(chunks, encoding=None, deadline=None):
+    """Yield the collections on a displayDetails page read from byte chunks.
+
+    Yields ``(year, month, day, colour)`` tuples as each month's container
+    closes, in the same order and with the same de-duplication as
+    parse_collection_schedule().
+    """
+    parser = ScheduleStreamParser(encoding)
+    for chunk in chunks:
+        yield from parser.feed_bytes(chunk, deadline)
+    yield from parser.finish(deadline)
+
+
+def parse_road_names_and_ids(data):
+    """Parse road names and IDs from the road list page."""
+    soup = BeautifulSoup(data, 'html.parser')
+    road_options = soup.find("select", {"name": "roadID"}).findAll("option")
+    road_names_and_ids = []
+    for road in road_options:
+        road_name = road.text
+        road_id = road["value"]
+        road_names_and_ids.append((road_name, road_id))
+    return road_names_and_ids
+
+
+def parse_road_list_page(body, encoding=None, deadline=None):
+    """Decode a road list response body and return its (road_name, road_id) tuples.
+
+    The road list is a single element, so the deadline is only checked once
+    the page has been parsed.
+    """
+    roads = parse_road_names_and_ids(body.decode(encoding or "utf-8", errors="replace"))
+    if deadline is not None and time.monotonic() > deadline:
+        raise ParseTimeout("Parsing the road list ran past its time budget")
+    return roads
@@ -0,0 +1,166 @@
+"""Recurrence model of a road's collections.
+
+Castle Point collects weekly on a fixed weekday, alternating black and pink
+bins, so each bin is collected fortnightly. The model fits that pattern to
+a parsed schedule: the collection weekday, which weeks are pink, and the
+days by which collections were moved from their usual day around bank
+holidays. Shifts are keyed on the nearest English bank holiday and the usual
+day's offset from it, so a collection moved for Easter Monday one year is
+moved again the next, whatever the date. Moves away from any bank holiday
+are one-offs and are not carried forward.
+
+Future collections are generated lazily, so a calendar query months past
+the end of the council page costs only the collections it returns.
+"""
+from collections import Counter
+from datetime import date, timedelta
+from functools import lru_cache
+
+from .events import Collection
+
+WEEK = 7
+MIN_OBSERVATIONS = 4
+MIN_AGREEMENT = 0.75
+HOLIDAY_WINDOW = 6
+
+
+def _easter_sunday(year):
+    """Return Easter Sunday for a year (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    w = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * w) // 451
+    month, day = divmod(h + w - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _last_monday(year, month):
+    """Return the last Monday of a month."""
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=last.weekday())
+
+
+@lru_cache(maxsize=8)
+def _bank_holidays(year):
+    """Return (name, date ordinal) for the English bank holidays collections move around."""
+    easter = _easter_sunday(year)
+    first_of_may = date(year, 5, 1)
+    return (
+        ("new_year", date(year, 1, 1).toordinal()),
+        ("good_friday", (easter - timedelta(days=2)).toordinal()),
+        ("easter_monday", (easter + timedelta(days=1)).toordinal()),
+        ("early_may", (first_of_may + timedelta(days=-first_of_may.weekday() % 7)).toordinal()),
+        ("spring", _last_monday(year, 5).toordinal()),
+        ("summer", _last_monday(year, 8).toordinal()),
+        ("christmas", date(year, 12, 25).toordinal()),
+        ("boxing_day", date(year, 12, 26).toordinal()),
+    )
+
+
+def _holiday_key(ordinal):
+    """Return (holiday, offset) for the bank holiday nearest a date, or None.
+
+    Only holidays within HOLIDAY_WINDOW days count; offset is the date's
+    ordinal minus the holiday's.
+    """
+    year = date.fromordinal(ordinal).year
+    nearest = None
+    for candidate in (year - 1, year, year + 1):
+        for name, holiday in _bank_holidays(candidate):
+            offset = ordinal - holiday
+            if abs(offset) <= HOLIDAY_WINDOW and (nearest is None or abs(offset) < abs(nearest[1])):
+                nearest = (name, offset)
+    return nearest
+
+
+class RecurrenceModel:
+    """A fitted weekly, alternating-colour collection pattern."""
+
+    __slots__ = ("weekday", "parity", "shifts")
+
+    def __init__(self, weekday, parity, shifts):
+        """Initialize.
+
+        weekday is the usual collection day as ``ordinal % 7``; a collection
+        whose usual date falls in week ``ordinal // 7`` is pink when that
+        week's parity matches ``parity``; shifts maps the _holiday_key() of a
+        usual date to the days it was moved by.
+        """
+        self.weekday = weekday
+        self.parity = parity
+        self.shifts = shifts
+
+    def _usual_ordinal(self, ordinal):
+        """Return the usual collection date nearest to an observed date."""
+        delta = (ordinal - self.weekday) % WEEK
+        if delta > WEEK // 2:
+            delta -= WEEK
+        return ordinal - delta
+
+    def _code(self, usual):
+        """Return the colour code for a usual collection date."""
+        return int((usual // WEEK) % 2 == self.parity)
+
+    @classmethod
+    def fit(cls, schedule):
+        """Return a model fitted to a CollectionSchedule, or None if it does not fit."""
+        if len(schedule) < MIN_OBSERVATIONS:
+            return None
+        ordinals = schedule.ordinals
+        weekday = Counter(ordinal % WEEK for ordinal in ordinals).most_common(1)[0][0]
+        model = cls(weekday, 0, {})
+
+        usual_dates = [model._usual_ordinal(ordinal) for ordinal in ordinals]
+        model.parity = Counter(
+            (usual // WEEK + 1 - collection.code) % 2
+            for usual, collection in zip(usual_dates, schedule)
+        ).most_common(1)[0][0]
+
+        matches = 0
+        for ordinal, usual, collection in zip(ordinals, usual_dates, schedule):
+            if model._code(usual) != collection.code:
+                continue
+            matches += 1
+            if ordinal != usual:
+                key = _holiday_key(usual)
+                if key is not None:
+                    model.shifts[key] = ordinal - usual
+        if matches / len(ordinals) < MIN_AGREEMENT:
+            return None
+        return model
+
+    def _predict(self, usual):
+        """Return the predicted Collection for a usual collection date."""
+        shift = self.shifts.get(_holiday_key(usual), 0) if self.shifts else 0
+        return Collection(usual + shift, self._code(usual))
+
+    def iter_from(self, ordinal):
+        """Yield predicted collections on or after a date ordinal, indefinitely."""
+        usual = self._usual_ordinal(ordinal) - WEEK
+        while True:
+            collection = self._predict(usual)
+            if collection.ordinal >= ordinal:
+                yield collection
+            usual += WEEK
+
+    def between(self, start, end):
+        """Return predicted collections with date ordinals in [start, end)."""
+        collections = []
+        for collection in self.iter_from(start):
+            if collection.ordinal >= end:
+                break
+            collections.append(collection)
+        return collections
+
+    def agrees(self, schedule):
+        """Return True if every collection in a schedule matches a prediction."""
+        for collection in schedule:
+            predicted = self._predict(self._usual_ordinal(collection.ordinal))
+            if predicted.ordinal != collection.ordinal or predicted.code != collection.code:
+                return False
+        return True
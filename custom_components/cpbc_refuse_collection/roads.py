@@ -0,0 +1,222 @@
+import asyncio
+from bisect import bisect_left
+import logging
+import re
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .common import fetch_road_list_page
+from .parser import parse_road_list_page
+from .worker import async_get_parse_executor
+from .const import (
+    DATA_ROAD_DIRECTORY,
+    ROAD_DIRECTORY_STORAGE_KEY,
+    ROAD_DIRECTORY_STORAGE_VERSION,
+    ROAD_DIRECTORY_RETRY_BACKOFF,
+    ROAD_DIRECTORY_TTL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+SEARCH_LIMIT = 50
+
+
+def async_get_road_directory(hass: HomeAssistant):
+    """Return the road directory shared by every flow and entry."""
+    directory = hass.data.get(DATA_ROAD_DIRECTORY)
+    if directory is None:
+        directory = hass.data[DATA_ROAD_DIRECTORY] = RoadDirectory(hass)
+    return directory
+
+
+def _tokens(text):
+    """Return the lower-case word tokens of a road name or query."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class RoadIndex:
+    """Lookup and search structure over a road list, built once per list.
+
+    Holds id-to-name and name-to-id maps for constant-time lookups, and a
+    sorted list of (token, road_id) pairs so that each query word is matched
+    as a prefix of a road name word by bisection.
+    """
+
+    def __init__(self, roads):
+        """Initialize from (road_name, road_id) tuples."""
+        self.roads = roads
+        self._name_by_id = {road_id: road_name for road_name, road_id in roads}
+        self._id_by_name = {}
+        for road_name, road_id in roads:
+            # Keep the first road when two share a name
+            self._id_by_name.setdefault(road_name, road_id)
+        self._tokens = sorted(
+            {(token, road_id) for road_name, road_id in roads for token in _tokens(road_name)}
+        )
+
+    def __len__(self):
+        """Return the number of roads."""
+        return len(self._name_by_id)
+
+    def __contains__(self, road_id):
+        """Return True if the road ID is in the list."""
+        return road_id in self._name_by_id
+
+    def name(self, road_id):
+        """Return the name of a road ID, or None."""
+        return self._name_by_id.get(road_id)
+
+    def road_id(self, road_name):
+        """Return the ID of a road name, or None."""
+        return self._id_by_name.get(road_name)
+
+    def _ids_with_token_prefix(self, prefix):
+        """Return the IDs of roads with a name word starting with prefix."""
+        ids = set()
+        position = bisect_left(self._tokens, (prefix,))
+        while position < len(self._tokens) and self._tokens[position][0].startswith(prefix):
+            ids.add(self._tokens[position][1])
+            position += 1
+        return ids
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Return up to limit (road_name, road_id) tuples matching every query word.
+
+        Matches are sorted by name before the cut, so callers that need to
+        know whether any were dropped ask for one more than they will show.
+        """
+        matches = None
+        for token in _tokens(query):
+            ids = self._ids_with_token_prefix(token)
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                return []
+        if matches is None:
+            return []
+        return sorted((self._name_by_id[road_id], road_id) for road_id in matches)[:limit]
+
+
+class RoadDirectory:
+    """Cache of the borough road list, persisted across restarts.
+
+    The list is served from memory while it is younger than
+    ``ROAD_DIRECTORY_TTL``. Once it expires it is revalidated with a
+    conditional GET, so an unchanged list costs a 304 rather than a full
+    download and parse. If the council site cannot be reached a stale list
+    is served rather than failing the caller, and no further attempt is made
+    for ``ROAD_DIRECTORY_RETRY_BACKOFF``, so callers are not queued behind
+    one request timeout after another while the site is down.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize."""
+        self.hass = hass
+        self._store = Store(hass, ROAD_DIRECTORY_STORAGE_VERSION, ROAD_DIRECTORY_STORAGE_KEY)
+        self._lock = asyncio.Lock()
+        self._loaded = False
+        self._roads = None
+        self._etag = None
+        self._last_modified = None
+        self._fetched = None
+        self._failed = None
+        self._index = None
+
+    @property
+    def fetched(self):
+        """Return when the list was last confirmed with the council site, or None.
+
+        A refresh that fails leaves this unchanged, so callers can tell a
+        confirmed list from a stale copy served while the site is down.
+        """
+        if self._fetched is None:
+            return None
+        return dt_util.utc_from_timestamp(self._fetched)
+
+    def _is_fresh(self):
+        """Return True if the cached list is within its TTL."""
+        if self._roads is None or self._fetched is None:
+            return False
+        return dt_util.utcnow().timestamp() - self._fetched < ROAD_DIRECTORY_TTL.total_seconds()
+
+    def _is_backing_off(self):
+        """Return True if the last refresh failed too recently to try again."""
+        if self._failed is None:
+            return False
+        return dt_util.utcnow().timestamp() - self._failed < ROAD_DIRECTORY_RETRY_BACKOFF.total_seconds()
+
+    async def _async_load(self):
+        """Load the persisted list the first time the directory is used."""
+        self._loaded = True
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        self._roads = [tuple(road) for road in stored.get("roads", [])]
+        self._etag = stored.get("etag")
+        self._last_modified = stored.get("last_modified")
+        self._fetched = stored.get("fetched")
+        _LOGGER.debug("Loaded %s roads from storage", len(self._roads))
+
+    async def _async_save(self):
+        """Persist the current list and its validators."""
+        await self._store.async_save({
+            "roads": self._roads,
+            "etag": self._etag,
+            "last_modified": self._last_modified,
+            "fetched": self._fetched,
+        })
+
+    async def _async_revalidate(self):
+        """Refresh the list with a conditional GET."""
+        headers = {}
+        if self._roads is not None:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+        result = await fetch_road_list_page(self.hass, headers)
+        if result.not_modified and self._roads is not None:
+            _LOGGER.debug("Road list not modified")
+        elif result.ok:
+            self._roads = await async_get_parse_executor(self.hass).async_run(
+                parse_road_list_page, result.body, result.encoding
+            )
+            self._etag = result.headers.get("ETag")
+            self._last_modified = result.headers.get("Last-Modified")
+            _LOGGER.debug("Fetched %s roads", len(self._roads))
+        else:
+            raise ValueError(f"Road list request failed with status {result.status}")
+        self._fetched = dt_util.utcnow().timestamp()
+        await self._async_save()
+
+    async def async_get_roads(self):
+        """Return the road list as (road_name, road_id) tuples."""
+        async with self._lock:
+            if not self._loaded:
+                await self._async_load()
+            if self._is_fresh():
+                return self._roads
+            if self._is_backing_off():
+                if self._roads is None:
+                    raise ValueError("Road list is unavailable, the last request for it failed")
+                return self._roads
+            try:
+                await self._async_revalidate()
+            except Exception as e:
+                self._failed = dt_util.utcnow().timestamp()
+                if self._roads is None:
+                    raise
+                _LOGGER.warning("Error refreshing road list, using cached copy: %s", e)
+            else:
+                self._failed = None
+            return self._roads
+
+    async def async_get_index(self):
+        """Return a RoadIndex over the current road list."""
+        roads = await self.async_get_roads()
+        if self._index is None or self._index.roads is not roads:
+            self._index = RoadIndex(roads)
+        return self._index
@@ -1,28 +1,56 @@
 import logging
-from homeassistant.helpers.entity import Entity
-from datetime import datetime, timedelta
-from homeassistant.util.dt import as_local, utcnow
-from homeassistant.helpers.event import async_track_time_interval
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.core import callback
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.const import UnitOfInformation, UnitOfTime
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
+from .entity import CpbcRefuseCollectionDerivedEntity
+from .events import COLOURS
+from .validation import async_get_road_validator
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up CPBC Refuse Collection Sensor based on a config entry."""
     coordinator = hass.data[DOMAIN][entry.entry_id]['coordinator']
-    async_add_entities([CpbcRefuseCollectionSensor(coordinator)], True)
+    async_add_entities([
+        CpbcRefuseCollectionSensor(coordinator, entry),
+        *(CpbcRefuseCollectionBinSensor(coordinator, entry, colour) for colour in COLOURS),
+        CpbcRefuseCollectionDaysUntilSensor(coordinator, entry),
+    ])
     validation_sensor = CpbcRefuseCollectionValidationSensor(coordinator, entry)
-    async_add_entities([validation_sensor], True)
+    async_add_entities([validation_sensor])
+    async_add_entities(
+        [CpbcRefuseCollectionMetricSensor(coordinator, entry, *metric) for metric in METRIC_SENSORS]
+    )
+
+# (key, name, unit, device class, value function) for the refresh diagnostic sensors
+METRIC_SENSORS = (
+    ("fetch_latency", "Fetch Latency", UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION,
+     lambda metrics: None if metrics.last_fetch_latency is None else round(metrics.last_fetch_latency * 1000, 1)),
+    ("response_size", "Response Size", UnitOfInformation.BYTES, SensorDeviceClass.DATA_SIZE,
+     lambda metrics: metrics.last_response_bytes),
+    ("parse_time", "Parse Time", UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION,
+     lambda metrics: None if metrics.last_parse_time is None else round(metrics.last_parse_time * 1000, 1)),
+    ("loop_time", "Loop Blocking Time", UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION,
+     lambda metrics: None if metrics.last_loop_time is None else round(metrics.last_loop_time * 1000, 1)),
+    ("event_count", "Event Count", None, None,
+     lambda metrics: metrics.event_count),
+    ("cache_hits", "Cache Hits", None, None,
+     lambda metrics: metrics.hits),
+    ("last_success", "Last Successful Update", None, SensorDeviceClass.TIMESTAMP,
+     lambda metrics: metrics.last_success),
+)
+
+class CpbcRefuseCollectionSensor(CpbcRefuseCollectionDerivedEntity):
+    """The next collection, updated by push rather than polling."""
 
-class CpbcRefuseCollectionSensor(Entity):
-    def __init__(self, coordinator):
+    def __init__(self, coordinator, entry):
         """Initialize the sensor."""
-        self.coordinator = coordinator
-        self._state = None
-        self._attributes = {}
-        self._unique_id = f"cpbc_refuse_collection_next_event_{coordinator.road_id}"
+        super().__init__(coordinator)
+        self._unique_id = f"cpbc_refuse_collection_next_event_{entry.entry_id}"
 
     @property
     def unique_id(self):
@@ -37,38 +65,96 @@ class CpbcRefuseCollectionSensor(Entity):
     @property
     def state(self):
         """Return the state of the sensor."""
-        return self._state
+        event = self.derived.current
+        return event.colour if event is not None else None
 
     @property
     def device_state_attributes(self):
         """Return the state attributes."""
-        return self._attributes or {"initial": "No data yet"}
+        return self.extra_state_attributes
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        return self._attributes or {"initial": "No data yet"}
+        event = self.derived.current
+        if event is None:
+            return {"initial": "No data yet"}
+        return {
+            "collection_date": event.date,
+            "collection_type": event.colour,
+            "days_until": self.derived.days_until,
+            "type": event.summary
+        }
+
+class CpbcRefuseCollectionBinSensor(CpbcRefuseCollectionDerivedEntity, SensorEntity):
+    """The date of the next collection of one bin."""
+
+    _attr_device_class = SensorDeviceClass.DATE
+
+    def __init__(self, coordinator, entry, colour):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._colour = colour
+        self._unique_id = f"cpbc_refuse_collection_next_{colour}_{entry.entry_id}"
+
+    @property
+    def unique_id(self):
+        """Return a unique ID for the sensor."""
+        return self._unique_id
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"CPBC Next {self._colour.capitalize()} Bin Collection"
+
+    @property
+    def native_value(self):
+        """Return the date of the next collection of this bin."""
+        collection = self.derived.next_collection(self._colour)
+        return collection.date if collection is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        collection = self.derived.next_collection(self._colour)
+        if collection is None:
+            return {}
+        return {"days_until": (collection.date - self.derived.today).days}
+
+class CpbcRefuseCollectionDaysUntilSensor(CpbcRefuseCollectionDerivedEntity, SensorEntity):
+    """Days until the next collection."""
+
+    _attr_native_unit_of_measurement = UnitOfTime.DAYS
+
+    def __init__(self, coordinator, entry):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._unique_id = f"cpbc_refuse_collection_days_until_{entry.entry_id}"
 
-    async def async_update(self):
-        """Update the sensor."""
-        events = self.coordinator.data.get("events", [])
-        current_time = as_local(utcnow())
-
-        for event in events:
-            start_time = as_local(event["start"])
-            end_time = as_local(event["end"])
-            if start_time.date() >= current_time.date() and end_time >= current_time:
-                self._state = event["description"]
-                days_until = (start_time.date() - current_time.date()).days
-                self._attributes = {
-                    "collection_date": start_time.date(),
-                    "collection_type": event["description"],
-                    "days_until": days_until,
-                    "type": event["summary"]
-                }
-                break
+    @property
+    def unique_id(self):
+        """Return a unique ID for the sensor."""
+        return self._unique_id
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return "CPBC Days Until Refuse Collection"
+
+    @property
+    def native_value(self):
+        """Return the days until the next collection."""
+        return self.derived.days_until
 
 class CpbcRefuseCollectionValidationSensor(SensorEntity):
+    """Whether the configured road is still in the council's road list.
+
+    Results are pushed by the validator shared across entries, which only
+    notifies this sensor when its road was added, removed or renamed.
+    """
+
+    _attr_should_poll = False
+
     def __init__(self, coordinator, entry):
         """Initialize the sensor."""
         self.coordinator = coordinator
@@ -76,6 +162,7 @@ class CpbcRefuseCollectionValidationSensor(SensorEntity):
         self._state = "Unknown"
         self._unique_id = f"cpbc_refuse_collection_validation_{entry.entry_id}"
         self._attributes = {}
+        self._validator = None
 
     @property
     def unique_id(self):
@@ -102,37 +189,65 @@ class CpbcRefuseCollectionValidationSensor(SensorEntity):
         """Return the state attributes."""
         return self._attributes or {"initial": "No data yet"}
 
-    async def async_validate_road_details(self, *_):
-        """Validate road details against fetched data."""
+    @callback
+    def _update_validation(self):
+        """Update the state from the shared validator's latest result."""
         road_id = self.entry.data.get("road_id")
         road_name = self.entry.data.get("road_name")
-        road_names_and_ids = await self.coordinator._fetch_road_names_and_ids()
-        validation_timestamp = as_local(datetime.now())
-        _LOGGER.debug("Expecting: %s:%s", road_id, road_name)
-        search_road = next(((r_name, r_id) for r_name, r_id in road_names_and_ids if r_id == road_id and r_name == road_name), None)
-        _LOGGER.debug("Got: %s", search_road)
-        if search_road != None:
-            _LOGGER.debug("Road ID and Name validation passed")
-            self._state = "pass"
-            self._attributes = {
-                "road_validation": "PASSED",
-                "last_validated": validation_timestamp
-                }
+        valid = self._validator.is_valid(road_id, road_name)
+        if valid is None:
+            return
+        _LOGGER.debug("Road %s:%s validation %s", road_id, road_name, "passed" if valid else "failed")
+        self._state = "pass" if valid else "failed"
+        self._attributes = {
+            "road_validation": "PASSED" if valid else "FAILED",
+            "last_validated": self._validator.last_validated,
+        }
+
+    @callback
+    def _handle_validation(self, changed):
+        """Handle a validation cycle, re-checking the road only if it changed."""
+        if changed or not self._attributes:
+            self._update_validation()
         else:
-            _LOGGER.debug("Road ID and Name validation failed")
-            self._state = "failed"
-            self._attributes = {
-                "road_validation": "FAILED",
-                "last_validated": validation_timestamp
-                }
+            self._attributes = {**self._attributes, "last_validated": self._validator.last_validated}
+        self.async_write_ha_state()
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
         await super().async_added_to_hass()
-        # perform initial validation check at integration start
-        await self.async_validate_road_details()
-        # Set up a periodic check
-        async_track_time_interval(self.hass, self.async_validate_road_details, timedelta(days=7))
+        self._validator = async_get_road_validator(self.hass)
+        self._update_validation()
+        self.async_on_remove(
+            self._validator.async_add_listener(self.entry.data.get("road_id"), self._handle_validation)
+        )
+
+class CpbcRefuseCollectionMetricSensor(CoordinatorEntity, SensorEntity):
+    """A diagnostic sensor reporting one refresh metric, disabled by default."""
 
-    async def async_update(self):
-        """Update the sensor."""
\ No newline at end of file
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, entry, key, name, unit, device_class, value_fn):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._name = f"CPBC Refuse Collection {name}"
+        self._unique_id = f"cpbc_refuse_collection_{key}_{entry.entry_id}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._value_fn = value_fn
+
+    @property
+    def unique_id(self):
+        """Return a unique ID for the sensor."""
+        return self._unique_id
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return self._name
+
+    @property
+    def native_value(self):
+        """Return the metric value."""
+        return self._value_fn(self.coordinator.metrics)
@@ -0,0 +1,159 @@
+"""Derived state shared by a road's entities.
+
+Every entity for a road shows some view of the same few facts: the next
+collection, the next collection of each bin, how many days away it is and
+whether tonight is bin night. ``DerivedStateEngine`` computes those once per
+coordinator update and again whenever the answer can change without new
+data, which is local midnight or the end of the current collection. The
+result is an immutable ``DerivedState`` that entities read without further
+work, so an extra entity costs nothing per update.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+import logging
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util.dt import as_local, as_utc, start_of_local_day, utcnow
+
+from .events import COLOURS, Collection
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DerivedState:
+    """A snapshot of a road's collection state at one moment."""
+
+    computed: datetime
+    today: date
+    current: Collection | None = None
+    next_by_colour: tuple = (None,) * len(COLOURS)
+    valid_until: datetime | None = None
+
+    @property
+    def days_until(self):
+        """Return the days from today to the current collection, or None."""
+        if self.current is None:
+            return None
+        return (self.current.date - self.today).days
+
+    @property
+    def bins_out_tonight(self):
+        """Return the colours of the bins collected tomorrow."""
+        tomorrow = self.today + timedelta(days=1)
+        return [
+            collection.colour
+            for collection in self.next_by_colour
+            if collection is not None and collection.date == tomorrow
+        ]
+
+    @property
+    def bin_night(self):
+        """Return True if a collection is due tomorrow."""
+        return bool(self.bins_out_tonight)
+
+    def next_collection(self, colour):
+        """Return the next collection of a bin colour that has not ended, or None."""
+        return self.next_by_colour[COLOURS.index(colour)]
+
+
+def compute_derived_state(index, now):
+    """Return the DerivedState of an EventIndex at a UTC moment."""
+    local_now = as_local(now)
+    today = local_now.date()
+    valid_until = as_utc(start_of_local_day(today + timedelta(days=1)))
+    if index is None:
+        return DerivedState(now, today, valid_until=valid_until)
+
+    current = None
+    next_by_colour = [None] * len(COLOURS)
+    missing = len(COLOURS)
+    for collection in index.upcoming(now):
+        if current is None:
+            current = collection
+        if next_by_colour[collection.code] is None:
+            next_by_colour[collection.code] = collection
+            missing -= 1
+            if not missing:
+                break
+
+    if current is not None and now < current.end < valid_until:
+        valid_until = current.end
+    return DerivedState(now, today, current, tuple(next_by_colour), valid_until)
+
+
+class DerivedStateEngine:
+    """Keep one road's DerivedState current and push it to listening entities.
+
+    The engine only listens to its coordinator and keeps a timer while at
+    least one entity is listening.
+    """
+
+    def __init__(self, coordinator):
+        """Initialize."""
+        self._coordinator = coordinator
+        self._listeners = {}
+        self._unsub_coordinator = None
+        self._unsub_timer = None
+        self.state = None
+
+    @callback
+    def async_add_listener(self, update_callback):
+        """Call update_callback whenever the state changes. Return a remover."""
+        if not self._listeners:
+            self._unsub_coordinator = self._coordinator.async_add_listener(
+                self._handle_coordinator_update
+            )
+            self._recompute()
+
+        key = object()
+        self._listeners[key] = update_callback
+
+        @callback
+        def remove_listener():
+            self._listeners.pop(key, None)
+            if not self._listeners:
+                self._stop()
+
+        return remove_listener
+
+    def _stop(self):
+        """Stop listening to the coordinator and the clock."""
+        if self._unsub_coordinator is not None:
+            self._unsub_coordinator()
+            self._unsub_coordinator = None
+        self._cancel_timer()
+
+    def _cancel_timer(self):
+        """Cancel the pending recompute."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    def _recompute(self):
+        """Recompute the state and schedule the next point it can change."""
+        self._cancel_timer()
+        data = self._coordinator.data
+        self.state = compute_derived_state(data["index"] if data else None, utcnow())
+        self._unsub_timer = async_track_point_in_utc_time(
+            self._coordinator.hass, self._handle_timer, self.state.valid_until
+        )
+
+    def _notify(self):
+        """Push the new state to every listener."""
+        for update_callback in list(self._listeners.values()):
+            update_callback()
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Recompute after the coordinator publishes data."""
+        self._recompute()
+        self._notify()
+
+    @callback
+    def _handle_timer(self, now):
+        """Recompute at midnight or the end of a collection."""
+        self._unsub_timer = None
+        self._recompute()
+        self._notify()
@@ -0,0 +1,174 @@
+"""Road list validation shared by every entry.
+
+Each entry's validation sensor checks that its road ID is still in the
+council's road list under the name it was configured with. One
+``RoadValidator`` serves all of them: it reads the road list from the shared
+road directory once per cycle, and compares a hash of the whole list with
+the previous cycle's, so an unchanged list costs nothing further. A changed
+list is diffed against the previous one by road ID, and only sensors whose
+road was added, removed or renamed are told to re-check; the rest are just
+told the new ``last_validated`` time. That time is when the road directory
+last confirmed the list with the council site, so a stale copy served while
+the site is down does not count as a fresh validation. If the first fetch
+fails, it is retried after ``VALIDATION_RETRY_DELAY`` rather than waiting a
+whole cycle.
+"""
+import asyncio
+from dataclasses import dataclass, field
+import hashlib
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import DATA_ROAD_VALIDATOR, VALIDATION_INTERVAL, VALIDATION_RETRY_DELAY
+from .roads import async_get_road_directory
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def async_get_road_validator(hass: HomeAssistant):
+    """Return the road validator shared by every entry."""
+    validator = hass.data.get(DATA_ROAD_VALIDATOR)
+    if validator is None:
+        validator = hass.data[DATA_ROAD_VALIDATOR] = RoadValidator(hass)
+    return validator
+
+
+def road_list_hash(roads):
+    """Return a digest of a road list that changes if any road ID or name does."""
+    digest = hashlib.sha256()
+    for road_name, road_id in sorted(roads, key=lambda road: road[1]):
+        digest.update(f"{road_id}\t{road_name}\n".encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class RoadListDiff:
+    """Road IDs that differ between two road lists."""
+
+    added: set = field(default_factory=set)
+    removed: set = field(default_factory=set)
+    renamed: set = field(default_factory=set)
+
+    @property
+    def changed(self):
+        """Return every road ID whose validation result may have changed."""
+        return self.added | self.removed | self.renamed
+
+    @classmethod
+    def between(cls, old, new):
+        """Return the diff from one {road_id: road_name} map to another."""
+        return cls(
+            added=new.keys() - old.keys(),
+            removed=old.keys() - new.keys(),
+            renamed={road_id for road_id in old.keys() & new.keys() if old[road_id] != new[road_id]},
+        )
+
+
+class RoadValidator:
+    """Validate every configured road against one copy of the road list.
+
+    Sensors register a callback for their road ID, called after every
+    successful validation with whether that road's result may have changed.
+    The first registration schedules a validation, so sensors added together
+    on startup share one fetch, and starts the periodic cycle; it stops when
+    the last sensor is removed.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize."""
+        self.hass = hass
+        self._lock = asyncio.Lock()
+        self._names = None
+        self._hash = None
+        self._listeners = {}
+        self._unsub_interval = None
+        self._unsub_retry = None
+        self._pending = None
+        self.last_validated = None
+
+    def is_valid(self, road_id, road_name):
+        """Return whether a road ID has a road name, or None before the first validation."""
+        if self._names is None:
+            return None
+        return self._names.get(road_id) == road_name
+
+    @callback
+    def async_add_listener(self, road_id, update_callback):
+        """Call update_callback(changed) after each validation. Return a remover."""
+        if not self._listeners:
+            self._unsub_interval = async_track_time_interval(
+                self.hass, self.async_validate, VALIDATION_INTERVAL
+            )
+        if self._names is None and self._pending is None:
+            self._pending = self.hass.async_create_task(self.async_validate())
+
+        key = object()
+        self._listeners.setdefault(road_id, {})[key] = update_callback
+
+        @callback
+        def remove_listener():
+            callbacks = self._listeners.get(road_id, {})
+            callbacks.pop(key, None)
+            if not callbacks:
+                self._listeners.pop(road_id, None)
+            if not self._listeners:
+                if self._unsub_interval is not None:
+                    self._unsub_interval()
+                    self._unsub_interval = None
+                if self._unsub_retry is not None:
+                    self._unsub_retry()
+                    self._unsub_retry = None
+
+        return remove_listener
+
+    async def async_validate(self, *_):
+        """Fetch the road list and notify every sensor, flagging those whose road changed."""
+        if self._unsub_retry is not None:
+            self._unsub_retry()
+            self._unsub_retry = None
+        changed = set()
+        try:
+            async with self._lock:
+                directory = async_get_road_directory(self.hass)
+                try:
+                    roads = await directory.async_get_roads()
+                except Exception as e:
+                    _LOGGER.warning("Error fetching road list for validation: %s", e)
+                    if self._names is None and self._listeners and self._unsub_retry is None:
+                        self._unsub_retry = async_call_later(
+                            self.hass, VALIDATION_RETRY_DELAY, self.async_validate
+                        )
+                    return
+                # A stale copy served while the site is down leaves this alone
+                if directory.fetched is not None:
+                    self.last_validated = dt_util.as_local(directory.fetched)
+                road_hash = road_list_hash(roads)
+                if road_hash == self._hash:
+                    _LOGGER.debug("Road list unchanged, %s roads", len(roads))
+                else:
+                    changed = self._apply(roads, road_hash)
+        finally:
+            self._pending = None
+
+        for road_id, callbacks in list(self._listeners.items()):
+            for update_callback in list(callbacks.values()):
+                update_callback(road_id in changed)
+
+    def _apply(self, roads, road_hash):
+        """Store a changed road list and return the listened road IDs it affects."""
+        names = {road_id: road_name for road_name, road_id in roads}
+        if self._names is None:
+            changed = set(self._listeners)
+        else:
+            diff = RoadListDiff.between(self._names, names)
+            _LOGGER.debug(
+                "Road list changed: %s added, %s removed, %s renamed",
+                len(diff.added), len(diff.removed), len(diff.renamed),
+            )
+            changed = diff.changed & self._listeners.keys()
+        self._names = names
+        self._hash = road_hash
+        return changed
@@ -0,0 +1,108 @@
+"""Bounded worker pool for HTML parsing.
+
+Parsing a council page with BeautifulSoup takes tens of milliseconds of pure
+Python. Run on the event loop, many entries refreshing together would stall
+every other integration, so parsing runs on a small dedicated pool instead:
+a thread pool by default, or a process pool when ``PARSE_USE_PROCESSES`` is
+set, which also takes parsing off the GIL. The pool is bounded so that a
+burst of refreshes queues rather than starving Home Assistant's shared
+executor.
+
+Each job gets a time budget. The parsers check the deadline they are given
+and abandon the work cooperatively; if a job has not returned shortly after
+its deadline the caller stops waiting regardless. A job cancelled before it
+starts is removed from the queue.
+
+Incremental parsers keep state between the chunks they are fed, which a
+process cannot share with the event loop, so ``async_feed`` always runs on
+threads. Each call handles one chunk, so the GIL is held only briefly.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+import logging
+import time
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DATA_PARSE_EXECUTOR,
+    DOMAIN,
+    PARSE_MAX_WORKERS,
+    PARSE_TIME_BUDGET,
+    PARSE_TIMEOUT_GRACE,
+    PARSE_USE_PROCESSES,
+)
+from .parser import ParseTimeout
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def async_get_parse_executor(hass: HomeAssistant):
+    """Return the parse executor shared by every entry."""
+    executor = hass.data.get(DATA_PARSE_EXECUTOR)
+    if executor is None:
+        executor = hass.data[DATA_PARSE_EXECUTOR] = ParseExecutor(
+            PARSE_MAX_WORKERS, PARSE_USE_PROCESSES
+        )
+
+        def shutdown(event):
+            hass.data.pop(DATA_PARSE_EXECUTOR, None)
+            executor.shutdown()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, shutdown)
+    return executor
+
+
+class ParseExecutor:
+    """Run parser functions on a bounded pool with a time budget."""
+
+    def __init__(self, max_workers=PARSE_MAX_WORKERS, use_processes=False):
+        """Initialize."""
+        self._threads = ThreadPoolExecutor(max_workers, thread_name_prefix=f"{DOMAIN}_parse")
+        if use_processes:
+            self._executor = ProcessPoolExecutor(max_workers)
+        else:
+            self._executor = self._threads
+
+    async def async_run(self, func, *args, budget=PARSE_TIME_BUDGET):
+        """Run func(*args, deadline=...) on the pool and return its result.
+
+        Raises ParseTimeout if the work does not finish within the budget.
+        Cancelling the caller cancels the job if it has not started yet.
+        """
+        deadline = time.monotonic() + budget
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(func, *args, deadline=deadline)
+        )
+        try:
+            return await asyncio.wait_for(future, budget + PARSE_TIMEOUT_GRACE)
+        except asyncio.TimeoutError:
+            raise ParseTimeout(f"{func.__name__} did not finish within {budget}s") from None
+
+    async def async_feed(self, method, *args, budget):
+        """Run a stateful parser's method(*args, deadline=...) on a thread.
+
+        budget is what is left of the document's parse budget: callers
+        subtract the time earlier calls for the same document took, so only
+        time spent parsing counts against it, not time waiting for the next
+        chunk to arrive. Raises ParseTimeout once it is used up.
+        """
+        if budget <= 0:
+            raise ParseTimeout(f"{method.__name__} ran past its time budget")
+        deadline = time.monotonic() + budget
+        future = asyncio.get_running_loop().run_in_executor(
+            self._threads, partial(method, *args, deadline=deadline)
+        )
+        try:
+            return await asyncio.wait_for(future, budget + PARSE_TIMEOUT_GRACE)
+        except asyncio.TimeoutError:
+            raise ParseTimeout(f"{method.__name__} did not finish within its budget") from None
+
+    def shutdown(self):
+        """Stop the pool, dropping queued jobs."""
+        _LOGGER.debug("Shutting down parse executor")
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._threads is not self._executor:
+            self._threads.shutdown(wait=False, cancel_futures=True)
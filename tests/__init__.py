@@ -0,0 +1 @@
+"""Tests for the Castle Point Borough Council refuse collection integration."""
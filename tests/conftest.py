@@ -0,0 +1,45 @@
+"""Shared fixtures for the integration's tests.
+
+The HTML fixtures in ``fixtures/`` are pages shaped like the council's
+``wastecalendar`` road list and ``wastecalendar.displayDetails`` schedule
+pages, saved from the local stand-in (``tools/council_stub.py``) for January
+to April 2024 so the tests do not depend on today's date.
+"""
+from datetime import datetime
+import os
+from zoneinfo import ZoneInfo
+
+from homeassistant.util import dt as dt_util
+import pytest
+
+from custom_components.cpbc_refuse_collection.events import CollectionSchedule
+from custom_components.cpbc_refuse_collection.parser import parse_collection_schedule
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name):
+    """Return the contents of a fixture file as text."""
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as fixture_file:
+        return fixture_file.read()
+
+
+@pytest.fixture(autouse=True)
+def local_time_zone():
+    """Run every test in the council's time zone."""
+    dt_util.set_default_time_zone(ZoneInfo("Europe/London"))
+    yield
+    dt_util.set_default_time_zone(dt_util.UTC)
+
+
+def local(year, month, day, hour=0, minute=0, microsecond=0):
+    """Return a UTC datetime for a wall-clock time in the council's time zone."""
+    return dt_util.as_utc(
+        datetime(year, month, day, hour, minute, 0, microsecond, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    )
+
+
+@pytest.fixture
+def schedule():
+    """Return the schedule on the schedule.html fixture."""
+    return CollectionSchedule.from_records(parse_collection_schedule(load_fixture("schedule.html")))
@@ -0,0 +1,91 @@
+"""Benchmarks for the integration's hot paths, run with pytest-benchmark.
+
+    pytest tests/test_benchmarks.py --benchmark-autosave
+    pytest tests/test_benchmarks.py --benchmark-compare --benchmark-compare-fail=min:25%
+
+The second form fails if any benchmark's best time regressed by more than
+25% against the last saved run, so it can gate a CI job. Run the rest of the
+suite with ``--benchmark-skip`` to leave these out.
+"""
+from datetime import timedelta
+
+from homeassistant.util import dt as dt_util
+import pytest
+
+from custom_components.cpbc_refuse_collection.const import STREAM_CHUNK_SIZE
+from custom_components.cpbc_refuse_collection.events import CollectionSchedule, EventIndex
+from custom_components.cpbc_refuse_collection.parser import (
+    BACKENDS,
+    iter_schedule_records,
+    parse_collection_schedule,
+    parse_road_names_and_ids,
+    select_backend,
+)
+from custom_components.cpbc_refuse_collection.state import compute_derived_state
+
+from .conftest import load_fixture
+
+pytest.importorskip("pytest_benchmark")
+
+SCHEDULE_PAGES = ("schedule.html", "schedule_large.html", "schedule_malformed.html")
+AVAILABLE_BACKENDS = [backend for backend in BACKENDS if select_backend(backend) == backend]
+
+
+@pytest.fixture(scope="module")
+def large_schedule():
+    """Return the schedule on the large fixture."""
+    return CollectionSchedule.from_records(
+        parse_collection_schedule(load_fixture("schedule_large.html"))
+    )
+
+
+@pytest.mark.parametrize("backend", AVAILABLE_BACKENDS)
+@pytest.mark.parametrize("page", SCHEDULE_PAGES)
+def test_parse_schedule_page(benchmark, page, backend):
+    """Parse a displayDetails page with each installed backend."""
+    html = load_fixture(page)
+    benchmark(parse_collection_schedule, html, backend)
+
+
+@pytest.mark.parametrize("page", SCHEDULE_PAGES)
+def test_stream_parse_schedule_page(benchmark, page):
+    """Parse a displayDetails page with ScheduleStreamParser, as a refresh does."""
+    body = load_fixture(page).encode()
+    chunks = [body[start:start + STREAM_CHUNK_SIZE] for start in range(0, len(body), STREAM_CHUNK_SIZE)]
+    benchmark(lambda: list(iter_schedule_records(chunks)))
+
+
+def test_parse_road_list(benchmark):
+    """Parse the borough road list."""
+    html = load_fixture("road_list.html")
+    assert len(benchmark(parse_road_names_and_ids, html)) == 1500
+
+
+def test_build_index(benchmark, large_schedule):
+    """Build the event index a refresh publishes."""
+    benchmark(EventIndex, large_schedule)
+
+
+def test_next_calendar_event(benchmark, large_schedule):
+    """EventIndex.next_calendar_event, which answers the calendar entity's event."""
+    index = EventIndex(large_schedule)
+    benchmark(index.next_calendar_event, dt_util.utcnow())
+
+
+def test_calendar_events_between_month(benchmark, large_schedule):
+    """EventIndex.calendar_events_between over a month, warm cache."""
+    index = EventIndex(large_schedule)
+    now = dt_util.utcnow()
+    benchmark(index.calendar_events_between, now, now + timedelta(days=31))
+
+
+def test_calendar_events_between_year_cold(benchmark, large_schedule):
+    """EventIndex.calendar_events_between over a year on a new index."""
+    now = dt_util.utcnow()
+    benchmark(lambda: EventIndex(large_schedule).calendar_events_between(now, now + timedelta(days=365)))
+
+
+def test_derived_state(benchmark, large_schedule):
+    """compute_derived_state, which every sensor of a road reads from."""
+    index = EventIndex(large_schedule)
+    benchmark(compute_derived_state, index, dt_util.utcnow())
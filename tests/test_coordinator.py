@@ -0,0 +1,177 @@
+"""Tests for the coordinator's conditional, change-aware refreshes."""
+import asyncio
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+import pytest
+
+from custom_components.cpbc_refuse_collection import coordinator as coordinator_module
+from custom_components.cpbc_refuse_collection.client import FetchResult
+from custom_components.cpbc_refuse_collection.const import (
+    MAX_PREDICTED_UPDATE_INTERVAL,
+    MAX_UPDATE_INTERVAL,
+    MIN_UPDATE_INTERVAL,
+)
+from custom_components.cpbc_refuse_collection.coordinator import (
+    CpbcRefuseCollectionCalendarDataCoordinator,
+)
+from custom_components.cpbc_refuse_collection.events import CollectionSchedule
+
+from .conftest import load_fixture
+
+ROAD_ID = "1003"
+
+
+class FakeCouncil:
+    """Stand-in for the council site that answers with queued responses."""
+
+    def __init__(self, monkeypatch):
+        """Patch the coordinator's streaming fetch."""
+        self.responses = []
+        self.requests = []
+        self.page = load_fixture("schedule.html").encode()
+        monkeypatch.setattr(coordinator_module, "async_fetch_stream", self._fetch)
+
+    async def _fetch(self, hass, url, consume, headers=None):
+        self.requests.append(headers)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        status, body = response
+        if status != 200:
+            return FetchResult(url, status, None)
+        for start in range(0, len(body), 1024):
+            await consume(body[start:start + 1024], "utf-8")
+        return FetchResult(url, 200, None, {"ETag": '"v1"'}, "utf-8", streamed=len(body))
+
+
+def _run(tmp_path, test):
+    """Run test(hass) on a throwaway hass."""
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        try:
+            await test(hass)
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+@pytest.fixture
+def council(monkeypatch):
+    """Return the stand-in council site."""
+    return FakeCouncil(monkeypatch)
+
+
+def test_not_modified_keeps_data(tmp_path, council):
+    """A 304 answers a conditional request without rebuilding anything."""
+    council.responses = [(200, council.page), (304, None)]
+
+    async def test(hass):
+        coordinator = CpbcRefuseCollectionCalendarDataCoordinator(hass, ROAD_ID)
+        await coordinator.async_refresh()
+        data = coordinator.data
+        assert len(data["schedule"]) == 17
+
+        await coordinator.async_refresh()
+        assert coordinator.data is data
+        assert council.requests == [{}, {"If-None-Match": '"v1"'}]
+        assert (coordinator.metrics.parsed, coordinator.metrics.not_modified) == (1, 1)
+        assert coordinator.metrics.last_parse_time == 0.0
+
+    _run(tmp_path, test)
+
+
+def test_unchanged_page_is_not_rebuilt(tmp_path, council):
+    """A 200 hashing the same as the last page reuses the held data."""
+    council.responses = [(200, council.page), (200, council.page), (200, council.page[:-200])]
+
+    async def test(hass):
+        coordinator = CpbcRefuseCollectionCalendarDataCoordinator(hass, ROAD_ID)
+        await coordinator.async_refresh()
+        data = coordinator.data
+
+        await coordinator.async_refresh()
+        assert coordinator.data is data
+        assert coordinator.metrics.unchanged == 1
+
+        await coordinator.async_refresh()
+        assert coordinator.data is not data
+        assert coordinator.metrics.parsed == 2
+
+    _run(tmp_path, test)
+
+
+def test_failures_serve_stale_data(tmp_path, council):
+    """Once data is held, error statuses and exceptions keep serving it."""
+    council.responses = [(200, council.page), (500, None), OSError("council site is down")]
+
+    async def test(hass):
+        coordinator = CpbcRefuseCollectionCalendarDataCoordinator(hass, ROAD_ID)
+        await coordinator.async_refresh()
+        data = coordinator.data
+
+        await coordinator.async_refresh()
+        await coordinator.async_refresh()
+        assert coordinator.data is data
+        assert coordinator.last_update_success
+        assert coordinator.metrics.failed == 2
+
+    _run(tmp_path, test)
+
+
+def test_failure_without_data(tmp_path, council):
+    """With nothing held an exception fails the refresh."""
+    council.responses = [OSError("council site is down")]
+
+    async def test(hass):
+        coordinator = CpbcRefuseCollectionCalendarDataCoordinator(hass, ROAD_ID)
+        await coordinator.async_refresh()
+        assert not coordinator.last_update_success
+        assert coordinator.data is None
+
+    _run(tmp_path, test)
+
+
+def test_snapshot_seeds_the_next_start(tmp_path, council):
+    """A parsed page is saved, and a new coordinator starts from it and revalidates."""
+    council.responses = [(200, council.page), (304, None)]
+
+    async def test(hass):
+        first = CpbcRefuseCollectionCalendarDataCoordinator(hass, ROAD_ID)
+        assert not await first.async_load_snapshot()
+        await first.async_refresh()
+
+        second = CpbcRefuseCollectionCalendarDataCoordinator(hass, ROAD_ID)
+        assert await second.async_load_snapshot()
+        assert second.data["schedule"] == first.data["schedule"]
+        await second.async_refresh()
+        assert council.requests[-1] == {"If-None-Match": '"v1"'}
+        assert second.metrics.not_modified == 1
+
+    _run(tmp_path, test)
+
+
+def _schedule_ending_in(days):
+    """Return a one-collection schedule that many days from today."""
+    day = dt_util.now().date() + timedelta(days=days)
+    return CollectionSchedule.from_records([(day.year, day.month, day.day, "black")])
+
+
+def test_next_update_interval(tmp_path):
+    """The interval is a quarter of the schedule left, clamped, and stretched by agreements."""
+    async def test(hass):
+        coordinator = CpbcRefuseCollectionCalendarDataCoordinator(hass, ROAD_ID)
+
+        assert coordinator._next_update_interval(CollectionSchedule()) == MIN_UPDATE_INTERVAL
+        assert coordinator._next_update_interval(_schedule_ending_in(2)) == MIN_UPDATE_INTERVAL
+        assert coordinator._next_update_interval(_schedule_ending_in(12)) == timedelta(days=3)
+        assert coordinator._next_update_interval(_schedule_ending_in(120)) == MAX_UPDATE_INTERVAL
+
+        coordinator._agreements = 1
+        assert coordinator._next_update_interval(_schedule_ending_in(12)) == timedelta(days=6)
+        coordinator._agreements = 5
+        assert coordinator._next_update_interval(_schedule_ending_in(12)) == MAX_PREDICTED_UPDATE_INTERVAL
+
+    _run(tmp_path, test)
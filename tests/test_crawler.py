@@ -0,0 +1,81 @@
+"""Tests for the borough crawler and its dataset."""
+from array import array
+import asyncio
+from datetime import date
+
+from aiohttp import web
+
+from custom_components.cpbc_refuse_collection import crawler
+from custom_components.cpbc_refuse_collection.crawler import Dataset, crawl
+
+from .conftest import load_fixture
+
+
+def _ordinals(*days):
+    """Return an ordinal array for dates."""
+    return array("i", [day.toordinal() for day in days])
+
+
+def test_dataset_round_trip(tmp_path):
+    """A dataset survives save and load, including an empty group."""
+    dataset = Dataset(
+        roads={"1": ("High Road", 0), "2": ("Low Road", 0), "3": ("New Road", 1)},
+        groups=[(_ordinals(date(2024, 1, 4), date(2024, 1, 11), date(2024, 1, 25)), b"\x00\x01\x00"),
+                (array("i"), b"")],
+        generated="2024-01-01T00:00:00Z",
+    )
+    path = tmp_path / "dataset.json.gz"
+
+    dataset.save(path)
+    loaded = Dataset.load(path)
+
+    assert loaded.as_dict() == dataset.as_dict()
+    assert loaded.as_dict()["groups"][0] == {"start": 738889, "deltas": [7, 14], "colours": "010"}
+    assert loaded.records("2") == [
+        (2024, 1, 4, "black"), (2024, 1, 11, "pink"), (2024, 1, 25, "black")
+    ]
+    assert loaded.records("3") == []
+    assert loaded.records("4") is None
+
+
+def test_crawl_skips_roads_that_fail(monkeypatch):
+    """A road whose page cannot be parsed is skipped; the rest are grouped."""
+    schedule = load_fixture("schedule.html")
+    road_list = (
+        '<select name="roadID"><option value="">Select</option>'
+        '<option value="1">High Road</option><option value="2">Low Road</option>'
+        '<option value="3">Bad Road</option></select>'
+    )
+
+    async def index(request):
+        if request.query.get("fa") == "wastecalendar":
+            return web.Response(text=road_list, content_type="text/html")
+        return web.Response(text=request.query["roadID"] + schedule, content_type="text/html")
+
+    parse = crawler.parse_collection_schedule
+
+    def parse_or_fail(html):
+        if html.startswith("3"):
+            raise ValueError("day is out of range for month")
+        return parse(html)
+
+    monkeypatch.setattr(crawler, "parse_collection_schedule", parse_or_fail)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/index.cfm", index)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        try:
+            return await crawl(f"http://127.0.0.1:{port}/index.cfm", rate=0)
+        finally:
+            await runner.cleanup()
+
+    dataset = asyncio.run(run())
+
+    assert set(dataset.roads) == {"1", "2"}
+    assert len(dataset.groups) == 1
+    assert len(dataset.records("1")) == 17
@@ -0,0 +1,68 @@
+"""Tests for the sorted event index."""
+from datetime import date, timedelta
+
+from custom_components.cpbc_refuse_collection.events import (
+    COLLECTION_DURATION,
+    CollectionSchedule,
+    EventIndex,
+)
+
+from .conftest import local
+
+
+def test_next_event_at_start_boundary(schedule):
+    """A collection starting exactly now is next; a moment later it is not."""
+    index = EventIndex(schedule)
+    start = local(2024, 1, 11)
+
+    assert index.next_event(start).date == date(2024, 1, 11)
+    assert index.next_event(start + timedelta(microseconds=1)).date == date(2024, 1, 18)
+    assert index.next_event(start - timedelta(microseconds=1)).date == date(2024, 1, 11)
+
+
+def test_current_event_until_window_ends(schedule):
+    """The current collection stays current until its window ends."""
+    index = EventIndex(schedule)
+    end = local(2024, 1, 11) + COLLECTION_DURATION
+
+    assert index.current_event(end).date == date(2024, 1, 11)
+    assert index.current_event(end + timedelta(microseconds=1)).date == date(2024, 1, 18)
+
+
+def test_calendar_events_between_is_half_open(schedule):
+    """Range queries include collections starting at start and exclude those at end."""
+    index = EventIndex(schedule)
+
+    events = index.calendar_events_between(local(2024, 1, 11), local(2024, 1, 25))
+
+    assert [event.start for event in events] == [local(2024, 1, 11), local(2024, 1, 18)]
+    assert index.calendar_events_between(local(2024, 1, 12), local(2024, 1, 18)) == []
+
+
+def test_calendar_events_are_cached(schedule):
+    """Each CalendarEvent is built once per index."""
+    index = EventIndex(schedule)
+
+    assert index.next_calendar_event(local(2024, 1, 1)) is index.calendar_event(0)
+
+
+def test_past_the_schedule_without_model(schedule):
+    """With no recurrence model nothing is returned past the last collection."""
+    index = EventIndex(schedule)
+    after = local(2024, 5, 1)
+
+    assert index.next_event(after) is None
+    assert index.current_event(after) is None
+    assert index.next_calendar_event(after) is None
+    assert index.calendar_events_between(after, after + timedelta(days=30)) == []
+
+
+def test_empty_schedule():
+    """An empty schedule answers every query with nothing."""
+    index = EventIndex(CollectionSchedule())
+    now = local(2024, 1, 1)
+
+    assert len(index) == 0
+    assert index.next_event(now) is None
+    assert list(index.upcoming(now)) == []
+    assert index.calendar_events_between(now, now + timedelta(days=365)) == []
@@ -0,0 +1,73 @@
+"""Tests for the iCalendar feed view."""
+import asyncio
+from http import HTTPStatus
+from types import SimpleNamespace
+
+from custom_components.cpbc_refuse_collection.const import (
+    CONF_ICS_TOKEN,
+    DATA_ICS_TOKENS,
+    DOMAIN,
+)
+from custom_components.cpbc_refuse_collection.events import CollectionSchedule, EventIndex
+from custom_components.cpbc_refuse_collection.ics import CpbcRefuseCollectionIcsView, ics_path
+
+
+def _coordinator(records):
+    """Return a stand-in coordinator publishing an index over records."""
+    schedule = CollectionSchedule.from_records(records)
+    return SimpleNamespace(road_id="1003", data={"index": EventIndex(schedule, version=1)})
+
+
+def _hass(entry, coordinator):
+    """Return a stand-in hass with one set-up entry."""
+    return SimpleNamespace(
+        data={
+            DOMAIN: {entry.entry_id: {"coordinator": coordinator}},
+            DATA_ICS_TOKENS: {entry.data[CONF_ICS_TOKEN]: entry.entry_id},
+        },
+    )
+
+
+def _get(view, hass, token, headers=None):
+    """Request a feed from the view."""
+    request = SimpleNamespace(app={"hass": hass}, headers=headers or {})
+    return asyncio.run(view.get(request, token))
+
+
+def test_feed_is_served_by_token_only():
+    """The feed is found by the entry's token, never by the road ID."""
+    entry = SimpleNamespace(entry_id="entry", data={"road_id": "1003", CONF_ICS_TOKEN: "secret"})
+    hass = _hass(entry, _coordinator([(2024, 1, 4, "black")]))
+    view = CpbcRefuseCollectionIcsView()
+
+    response = _get(view, hass, "secret")
+
+    assert ics_path(entry) == f"/api/{DOMAIN}/secret.ics"
+    assert response.status == HTTPStatus.OK
+    assert b"DTSTART;VALUE=DATE:20240104" in response.body
+    assert _get(view, hass, "1003").status == HTTPStatus.NOT_FOUND
+    assert _get(view, hass, "secret", {"If-None-Match": response.headers["ETag"]}).status == (
+        HTTPStatus.NOT_MODIFIED
+    )
+
+
+def test_non_ascii_token_is_not_found():
+    """A token that decodes to non-ASCII text is a 404, not a server error."""
+    entry = SimpleNamespace(entry_id="entry", data={"road_id": "1003", CONF_ICS_TOKEN: "secret"})
+    hass = _hass(entry, _coordinator([(2024, 1, 4, "black")]))
+
+    assert _get(CpbcRefuseCollectionIcsView(), hass, "é").status == HTTPStatus.NOT_FOUND
+
+
+def test_new_coordinator_with_same_version_is_rendered():
+    """A reloaded entry's index reuses version numbers but is never served stale."""
+    entry = SimpleNamespace(entry_id="entry", data={"road_id": "1003", CONF_ICS_TOKEN: "secret"})
+    hass = _hass(entry, _coordinator([(2024, 1, 4, "black")]))
+    view = CpbcRefuseCollectionIcsView()
+    etag = _get(view, hass, "secret").headers["ETag"]
+
+    hass.data[DOMAIN][entry.entry_id]["coordinator"] = _coordinator([(2024, 1, 11, "pink")])
+    response = _get(view, hass, "secret", {"If-None-Match": etag})
+
+    assert response.status == HTTPStatus.OK
+    assert b"DTSTART;VALUE=DATE:20240111" in response.body
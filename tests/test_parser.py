@@ -0,0 +1,154 @@
+"""Tests for the council page parsers."""
+from datetime import date
+import time
+
+import pytest
+
+from custom_components.cpbc_refuse_collection.parser import (
+    BACKEND_HTML_PARSER,
+    BACKENDS,
+    ParseTimeout,
+    ScheduleStreamParser,
+    encode_records,
+    iter_schedule_records,
+    parse_collection_schedule,
+    parse_road_names_and_ids,
+    select_backend,
+)
+
+from .conftest import load_fixture
+
+SCHEDULE_PAGES = ("schedule.html", "schedule_large.html", "schedule_malformed.html")
+AVAILABLE_BACKENDS = [backend for backend in BACKENDS if select_backend(backend) == backend]
+
+
+def _chunks(data, size):
+    """Split bytes into chunks of a given size."""
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+def test_schedule_page():
+    """Every collection on the page is read once, in date order."""
+    records = parse_collection_schedule(load_fixture("schedule.html"), BACKEND_HTML_PARSER)
+
+    assert len(records) == 17
+    assert records[:3] == [
+        (2024, 1, 4, "black"),
+        (2024, 1, 11, "pink"),
+        (2024, 1, 18, "black"),
+    ]
+    days = [date(year, month, day) for year, month, day, _ in records]
+    assert days == sorted(set(days))
+    assert {day.weekday() for day in days} == {3}
+    assert all(first[3] != second[3] for first, second in zip(records, records[1:]))
+
+
+def test_months_rendered_twice_are_read_once():
+    """The page renders every month twice; only the first rendering is read."""
+    html = load_fixture("schedule.html")
+    assert html.count("<h2>January 2024</h2>") == 2
+
+    records = parse_collection_schedule(html, BACKEND_HTML_PARSER)
+
+    assert [record[:3] for record in records].count((2024, 1, 4)) == 1
+
+
+INVALID_DAY_PAGE = (
+    '<div class="calendarContainer"><h2>February 2024</h2><table>'
+    '<tr><td class="normal">1</td><td class="pink">31</td><td class="pink">8</td></tr>'
+    '</table></div>'
+)
+
+
+@pytest.mark.parametrize("backend", AVAILABLE_BACKENDS)
+def test_invalid_days_are_dropped(backend):
+    """A cell whose day does not exist in its month is skipped, not fatal."""
+    expected = [(2024, 2, 1, "black"), (2024, 2, 8, "pink")]
+
+    assert parse_collection_schedule(INVALID_DAY_PAGE, backend) == expected
+    assert list(iter_schedule_records([INVALID_DAY_PAGE.encode()])) == expected
+
+
+def test_encode_records_drops_invalid_dates():
+    """Records that are not real dates are left out of the encoding."""
+    ordinals, codes = encode_records([(2024, 2, 31, "black"), (2024, 2, 1, "pink")])
+
+    assert ordinals == [date(2024, 2, 1).toordinal()]
+    assert codes == b"\x01"
+
+
+def test_malformed_page():
+    """Truncated markup and unparseable headings and cells are skipped."""
+    records = parse_collection_schedule(load_fixture("schedule_malformed.html"), BACKEND_HTML_PARSER)
+
+    assert records == [
+        (2024, 1, 2, "black"),
+        (2024, 1, 9, "pink"),
+        (2024, 1, 16, "black"),
+        (2024, 1, 23, "pink"),
+        (2024, 1, 30, "black"),
+    ]
+
+
+@pytest.mark.parametrize("backend", AVAILABLE_BACKENDS)
+@pytest.mark.parametrize("page", SCHEDULE_PAGES)
+def test_backends_agree(backend, page):
+    """Every installed backend returns what html.parser returns."""
+    html = load_fixture(page)
+    assert parse_collection_schedule(html, backend) == parse_collection_schedule(
+        html, BACKEND_HTML_PARSER
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 512, 1 << 20])
+@pytest.mark.parametrize("page", SCHEDULE_PAGES)
+def test_stream_parser_matches_dom_parser(page, chunk_size):
+    """The incremental parser returns the same records however the body is split."""
+    html = load_fixture(page)
+    chunks = _chunks(html.encode(), chunk_size)
+
+    assert list(iter_schedule_records(chunks)) == parse_collection_schedule(
+        html, BACKEND_HTML_PARSER
+    )
+
+
+def test_stream_parser_releases_months_as_containers_close():
+    """Records are returned as soon as their container closes, not at the end."""
+    html = load_fixture("schedule.html").encode()
+    first_close = html.index(b"</table></div>") + len(b"</table></div>")
+    parser = ScheduleStreamParser()
+
+    released = parser.feed_bytes(html[:first_close])
+
+    assert [record[:2] for record in released] == [(2024, 1)] * 4
+    assert parser.feed_bytes(html[first_close:]) + parser.finish() != []
+
+
+def test_stream_parser_decodes_split_characters():
+    """A multi-byte character split across chunks is decoded once whole."""
+    html = load_fixture("schedule.html").replace("Waste Calendar", "Waste Calendar –")
+    chunks = _chunks(html.encode(), 3)
+
+    assert list(iter_schedule_records(chunks, "utf-8")) == parse_collection_schedule(
+        html, BACKEND_HTML_PARSER
+    )
+
+
+def test_deadline():
+    """Parsing stops once its deadline has passed."""
+    html = load_fixture("schedule.html")
+    expired = time.monotonic() - 1
+
+    with pytest.raises(ParseTimeout):
+        parse_collection_schedule(html, BACKEND_HTML_PARSER, deadline=expired)
+    with pytest.raises(ParseTimeout):
+        ScheduleStreamParser().feed_bytes(html.encode(), deadline=expired)
+
+
+def test_road_list():
+    """Every road on the road list is read with its ID."""
+    roads = parse_road_names_and_ids(load_fixture("road_list.html"))
+
+    assert len(roads) == 1500
+    assert roads[:2] == [("High Road 1", "1000"), ("Church Road 1", "1001")]
+    assert len({road_id for _, road_id in roads}) == 1500
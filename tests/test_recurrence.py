@@ -0,0 +1,76 @@
+"""Tests for the recurrence model."""
+from datetime import date, timedelta
+
+from custom_components.cpbc_refuse_collection.events import CollectionSchedule, EventIndex
+from custom_components.cpbc_refuse_collection.recurrence import RecurrenceModel
+
+
+def test_fit(schedule):
+    """The model finds the collection weekday and agrees with the page."""
+    model = RecurrenceModel.fit(schedule)
+
+    assert model is not None
+    assert model.weekday == date(2024, 1, 4).toordinal() % 7
+    assert model.agrees(schedule)
+
+
+def test_predictions_continue_the_pattern(schedule):
+    """Predictions keep the weekday and alternate colours past the page."""
+    model = RecurrenceModel.fit(schedule)
+    start = schedule.ordinals[-1] + 1
+
+    predicted = model.between(start, start + 28)
+
+    assert [collection.date for collection in predicted] == [
+        date(2024, 5, 2) + timedelta(weeks=week) for week in range(4)
+    ]
+    assert [collection.colour for collection in predicted] == ["pink", "black", "pink", "black"]
+
+
+def test_bank_holiday_shift_recurs_next_year():
+    """A collection moved for Easter Monday is moved again the next Easter."""
+    records = []
+    for week in range(17):
+        day = date(2024, 1, 8) + timedelta(weeks=week)
+        if day == date(2024, 4, 1):
+            day += timedelta(days=1)
+        records.append((day.year, day.month, day.day, ("black", "pink")[week % 2]))
+    model = RecurrenceModel.fit(CollectionSchedule.from_records(records))
+
+    predicted = model.between(date(2025, 4, 7).toordinal(), date(2025, 5, 1).toordinal())
+
+    assert [collection.date for collection in predicted] == [
+        date(2025, 4, 7), date(2025, 4, 14), date(2025, 4, 22), date(2025, 4, 28)
+    ]
+
+
+def test_too_few_collections():
+    """A schedule too short to establish a pattern is not fitted."""
+    schedule = CollectionSchedule.from_records(
+        [(2024, 1, 4, "black"), (2024, 1, 11, "pink"), (2024, 1, 18, "black")]
+    )
+
+    assert RecurrenceModel.fit(schedule) is None
+
+
+def test_irregular_schedule():
+    """A schedule with no weekly alternating pattern is not fitted."""
+    schedule = CollectionSchedule.from_records([
+        (2024, 1, 1, "black"),
+        (2024, 1, 3, "black"),
+        (2024, 1, 12, "pink"),
+        (2024, 1, 13, "pink"),
+        (2024, 1, 22, "black"),
+        (2024, 1, 28, "pink"),
+    ])
+
+    assert RecurrenceModel.fit(schedule) is None
+
+
+def test_index_falls_back_to_predictions(schedule):
+    """Past the page, the index answers from the model and marks events predicted."""
+    index = EventIndex(schedule, model=RecurrenceModel.fit(schedule))
+    after = index.schedule[-1].end + timedelta(days=1)
+
+    assert index.next_event(after).date == date(2024, 5, 2)
+    assert index.next_calendar_event(after).summary.endswith("(predicted)")
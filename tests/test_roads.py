@@ -0,0 +1,179 @@
+"""Tests for the road directory, the road index and the config flow's road search."""
+import asyncio
+from datetime import datetime, timezone
+
+from homeassistant.core import HomeAssistant
+import pytest
+
+from custom_components.cpbc_refuse_collection import roads
+from custom_components.cpbc_refuse_collection.client import FetchResult
+from custom_components.cpbc_refuse_collection.config_flow import _search_roads
+from custom_components.cpbc_refuse_collection.const import (
+    ROAD_DIRECTORY_RETRY_BACKOFF,
+    ROAD_DIRECTORY_TTL,
+)
+from custom_components.cpbc_refuse_collection.parser import parse_road_names_and_ids
+from custom_components.cpbc_refuse_collection.roads import SEARCH_LIMIT, RoadDirectory, RoadIndex
+
+from .conftest import load_fixture
+
+ROADS = [
+    ("High Street", "1"),
+    ("High Road", "2"),
+    ("Highfield Close", "3"),
+    ("Church Road", "4"),
+    ("High Street", "5"),
+]
+
+
+def test_search_matches_word_prefixes():
+    """Each query word must prefix a word of the road name, in any order."""
+    index = RoadIndex(ROADS)
+
+    assert index.search("high") == [
+        ("High Road", "2"), ("High Street", "1"), ("High Street", "5"), ("Highfield Close", "3")
+    ]
+    assert index.search("road HIGH") == [("High Road", "2")]
+    assert index.search("street church") == []
+    assert index.search("  ") == []
+
+
+def test_search_limit():
+    """Results are cut to the limit after sorting by name."""
+    index = RoadIndex(ROADS)
+
+    assert index.search("high", limit=2) == [("High Road", "2"), ("High Street", "1")]
+
+
+def test_lookups_keep_first_road_per_name():
+    """A name shared by two roads maps to the first of them."""
+    index = RoadIndex(ROADS)
+
+    assert index.road_id("High Street") == "1"
+    assert index.name("5") == "High Street"
+    assert "5" in index and "6" not in index
+    assert len(index) == 5
+
+
+def test_broad_search_is_refused():
+    """The config flow asks for a narrower search rather than hiding roads."""
+    index = RoadIndex(parse_road_names_and_ids(load_fixture("road_list.html")))
+    road_name, road_id = index.roads[0]
+
+    assert len(index.search("road", limit=None)) > SEARCH_LIMIT
+    assert _search_roads(index, "road") == ([], {"base": "too_many_roads"})
+    assert _search_roads(index, "zzzz") == ([], {"base": "no_roads_found"})
+    matches, errors = _search_roads(index, road_name)
+    assert not errors
+    assert (road_name, road_id) in matches
+
+
+ROAD_LIST = (
+    b'<select name="roadID">'
+    b'<option value="1">High Road</option><option value="2">Low Road</option></select>'
+)
+
+
+class FakeCouncil:
+    """Stand-in for the council site that answers with queued responses."""
+
+    def __init__(self, monkeypatch):
+        """Patch the road directory's fetch, parse pool and clock."""
+        self.responses = []
+        self.requests = []
+        self.now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        monkeypatch.setattr(roads, "fetch_road_list_page", self._fetch)
+        monkeypatch.setattr(roads, "async_get_parse_executor", lambda hass: self)
+        monkeypatch.setattr(roads.dt_util, "utcnow", lambda: self.now)
+
+    async def _fetch(self, hass, headers=None):
+        self.requests.append(headers)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def async_run(self, func, *args):
+        return func(*args)
+
+    def ok(self, etag):
+        """Queue a 200 carrying the road list."""
+        self.responses.append(FetchResult("url", 200, ROAD_LIST, {"ETag": etag}, "utf-8"))
+
+    def not_modified(self):
+        """Queue a 304."""
+        self.responses.append(FetchResult("url", 304, None))
+
+    def fail(self):
+        """Queue a connection error."""
+        self.responses.append(OSError("council site is down"))
+
+
+def _run(tmp_path, test):
+    """Run test(directory) against a road directory on a throwaway hass."""
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        try:
+            await test(RoadDirectory(hass))
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_directory_serves_cache_within_ttl_and_revalidates_after(tmp_path, monkeypatch):
+    """The list is fetched once per TTL; an expired list is revalidated with its ETag."""
+    council = FakeCouncil(monkeypatch)
+    council.ok('"v1"')
+    council.not_modified()
+
+    async def test(directory):
+        first = await directory.async_get_roads()
+        assert first == [("High Road", "1"), ("Low Road", "2")]
+        assert await directory.async_get_roads() is first
+        assert council.requests == [{}]
+
+        council.now += ROAD_DIRECTORY_TTL
+        assert await directory.async_get_roads() is first
+        assert council.requests[1] == {"If-None-Match": '"v1"'}
+        assert await directory.async_get_roads() is first
+        assert len(council.requests) == 2
+
+    _run(tmp_path, test)
+
+
+def test_directory_backs_off_after_a_failure(tmp_path, monkeypatch):
+    """While the site is down the cached list is served without retrying every call."""
+    council = FakeCouncil(monkeypatch)
+    council.ok('"v1"')
+    council.fail()
+    council.ok('"v2"')
+
+    async def test(directory):
+        cached = await directory.async_get_roads()
+        council.now += ROAD_DIRECTORY_TTL
+        assert await directory.async_get_roads() is cached
+        assert await directory.async_get_roads() is cached
+        assert len(council.requests) == 2
+
+        council.now += ROAD_DIRECTORY_RETRY_BACKOFF
+        await directory.async_get_roads()
+        assert len(council.requests) == 3
+        assert directory._etag == '"v2"'
+
+    _run(tmp_path, test)
+
+
+def test_directory_without_cache_raises(tmp_path, monkeypatch):
+    """With nothing cached a failure is raised, and not retried during the back-off."""
+    council = FakeCouncil(monkeypatch)
+    council.fail()
+
+    async def test(directory):
+        with pytest.raises(OSError):
+            await directory.async_get_roads()
+        with pytest.raises(ValueError):
+            await directory.async_get_roads()
+        assert len(council.requests) == 1
+
+    _run(tmp_path, test)
@@ -0,0 +1,42 @@
+"""Tests for the compact collection schedule."""
+from datetime import date
+
+from custom_components.cpbc_refuse_collection.events import COLLECTION_DURATION, CollectionSchedule
+
+from .conftest import local
+
+
+def test_from_records_sorts_and_keeps_first_record_per_date():
+    """Records are sorted by date and the first record for a date wins."""
+    schedule = CollectionSchedule.from_records([
+        (2024, 1, 11, "pink"),
+        (2024, 1, 4, "black"),
+        (2024, 1, 11, "black"),
+    ])
+
+    assert [(collection.date, collection.colour) for collection in schedule] == [
+        (date(2024, 1, 4), "black"),
+        (date(2024, 1, 11), "pink"),
+    ]
+
+
+def test_records_round_trip(schedule):
+    """A schedule survives conversion to records and back."""
+    assert CollectionSchedule.from_records(schedule.to_records()) == schedule
+
+
+def test_collection_window(schedule):
+    """A collection runs from local midnight for COLLECTION_DURATION."""
+    collection = schedule[0]
+
+    assert collection.start == local(2024, 1, 4)
+    assert collection.end == local(2024, 1, 4) + COLLECTION_DURATION
+
+
+def test_empty_schedule():
+    """An empty schedule has no collections."""
+    schedule = CollectionSchedule()
+
+    assert len(schedule) == 0
+    assert list(schedule) == []
+    assert schedule.to_records() == []
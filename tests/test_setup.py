@@ -0,0 +1,134 @@
+"""Tests for sharing coordinators between entries and migrating entity IDs."""
+import asyncio
+
+from homeassistant.config_entries import SOURCE_USER, ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+import pytest
+
+from custom_components.cpbc_refuse_collection import _async_migrate_unique_ids, coordinator
+from custom_components.cpbc_refuse_collection.const import DOMAIN
+from custom_components.cpbc_refuse_collection.coordinator import CoordinatorRegistry
+
+
+class FakeCoordinator:
+    """Coordinator stand-in whose first refresh can be made to fail."""
+
+    fail_next = False
+    created = []
+
+    def __init__(self, hass, road_id):
+        """Initialize."""
+        self.road_id = road_id
+        self.shut_down = False
+        FakeCoordinator.created.append(self)
+
+    async def async_load_snapshot(self):
+        return False
+
+    def load_dataset(self, dataset):
+        return False
+
+    async def async_refresh(self):
+        await asyncio.sleep(0)
+        if FakeCoordinator.fail_next:
+            FakeCoordinator.fail_next = False
+            raise ValueError("council site is down")
+
+    async def async_shutdown(self):
+        self.shut_down = True
+
+
+@pytest.fixture
+def fake_coordinator(monkeypatch):
+    """Make the registry create FakeCoordinators."""
+    FakeCoordinator.fail_next = False
+    FakeCoordinator.created = []
+    monkeypatch.setattr(coordinator, "CpbcRefuseCollectionCalendarDataCoordinator", FakeCoordinator)
+
+    async def no_dataset(hass):
+        return None
+
+    monkeypatch.setattr(coordinator, "async_get_dataset", no_dataset)
+
+
+def _run(tmp_path, test):
+    """Run test(hass) on a throwaway hass."""
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        try:
+            await test(hass)
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_entries_for_a_road_share_one_coordinator(tmp_path, fake_coordinator):
+    """Concurrent acquires share a coordinator, shut down on the last release."""
+    async def test(hass):
+        registry = CoordinatorRegistry(hass)
+        first, second = await asyncio.gather(
+            registry.async_acquire("1003"), registry.async_acquire("1003")
+        )
+        other = await registry.async_acquire("1004")
+        assert first is second is registry.get("1003")
+        assert other is not first
+        assert len(FakeCoordinator.created) == 2
+
+        await registry.async_release("1003")
+        assert registry.get("1003") is first and not first.shut_down
+        await registry.async_release("1003")
+        assert registry.get("1003") is None and first.shut_down
+        assert registry.get("1004") is other
+
+    _run(tmp_path, test)
+
+
+def test_failed_start_is_not_kept(tmp_path, fake_coordinator):
+    """A coordinator that fails to start is dropped with all its references."""
+    async def test(hass):
+        registry = CoordinatorRegistry(hass)
+        FakeCoordinator.fail_next = True
+        results = await asyncio.gather(
+            registry.async_acquire("1003"), registry.async_acquire("1003"), return_exceptions=True
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+        assert registry.get("1003") is None
+        assert FakeCoordinator.created[0].shut_down
+
+        retried = await registry.async_acquire("1003")
+        assert retried is registry.get("1003") is FakeCoordinator.created[1]
+        await registry.async_release("1003")
+        assert retried.shut_down
+
+    _run(tmp_path, test)
+
+
+def test_unique_ids_are_migrated_to_the_entry(tmp_path):
+    """The calendar and next collection sensor move to entry-keyed unique IDs."""
+    entry = ConfigEntry(
+        version=1, minor_version=1, domain=DOMAIN, title="Road", data={"road_id": "1003"},
+        source=SOURCE_USER, entry_id="abc",
+    )
+
+    async def test(hass):
+        await er.async_load(hass)
+        registry = er.async_get(hass)
+        calendar = registry.async_get_or_create(
+            "calendar", DOMAIN, "cpbc_refuse_collection_unique_id", config_entry=entry
+        )
+        sensor = registry.async_get_or_create(
+            "sensor", DOMAIN, "cpbc_refuse_collection_next_event_1003", config_entry=entry
+        )
+        other = registry.async_get_or_create(
+            "sensor", DOMAIN, "cpbc_refuse_collection_bin_black_abc", config_entry=entry
+        )
+
+        await _async_migrate_unique_ids(hass, entry)
+
+        assert registry.async_get(calendar.entity_id).unique_id == "cpbc_refuse_collection_calendar_abc"
+        assert registry.async_get(sensor.entity_id).unique_id == "cpbc_refuse_collection_next_event_abc"
+        assert registry.async_get(other.entity_id).unique_id == "cpbc_refuse_collection_bin_black_abc"
+
+    _run(tmp_path, test)
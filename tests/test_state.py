@@ -0,0 +1,67 @@
+"""Tests for the derived state shared by a road's entities."""
+from datetime import date
+
+import pytest
+
+from custom_components.cpbc_refuse_collection.events import COLLECTION_DURATION, EventIndex
+from custom_components.cpbc_refuse_collection.state import compute_derived_state
+
+from .conftest import local
+
+
+@pytest.fixture
+def index(schedule):
+    """Return an index over the schedule.html fixture."""
+    return EventIndex(schedule)
+
+
+def test_day_before_collection(index):
+    """The evening before a collection is bin night for that bin."""
+    state = compute_derived_state(index, local(2024, 1, 10, 20))
+
+    assert state.current.date == date(2024, 1, 11)
+    assert state.days_until == 1
+    assert state.next_collection("pink").date == date(2024, 1, 11)
+    assert state.next_collection("black").date == date(2024, 1, 18)
+    assert state.bin_night
+    assert state.bins_out_tonight == ["pink"]
+    assert state.valid_until == local(2024, 1, 11)
+
+
+def test_collection_day(index):
+    """On collection day the state holds until the collection window ends."""
+    state = compute_derived_state(index, local(2024, 1, 11, 9))
+
+    assert state.current.date == date(2024, 1, 11)
+    assert state.days_until == 0
+    assert not state.bin_night
+    assert state.valid_until == local(2024, 1, 11) + COLLECTION_DURATION
+
+
+def test_after_collection_window(index):
+    """Once a collection ends the next one becomes current."""
+    state = compute_derived_state(index, local(2024, 1, 11, 18))
+
+    assert state.current.date == date(2024, 1, 18)
+    assert state.next_collection("pink").date == date(2024, 1, 25)
+    assert state.days_until == 7
+    assert state.valid_until == local(2024, 1, 12)
+
+
+def test_past_the_schedule(index):
+    """With nothing left on the schedule every value is empty."""
+    state = compute_derived_state(index, local(2024, 6, 1, 12))
+
+    assert state.current is None
+    assert state.days_until is None
+    assert state.next_collection("black") is None
+    assert not state.bin_night
+
+
+def test_no_data():
+    """Before the first refresh the state is empty but still expires at midnight."""
+    state = compute_derived_state(None, local(2024, 1, 10, 12))
+
+    assert state.current is None
+    assert state.today == date(2024, 1, 10)
+    assert state.valid_until == local(2024, 1, 11)
@@ -0,0 +1,131 @@
+"""Tests for the shared road validator."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.cpbc_refuse_collection import validation
+from custom_components.cpbc_refuse_collection.const import DATA_ROAD_DIRECTORY
+from custom_components.cpbc_refuse_collection.validation import (
+    RoadListDiff,
+    RoadValidator,
+    road_list_hash,
+)
+
+
+def test_road_list_hash_ignores_order():
+    """The hash depends on the roads, not the order the page lists them in."""
+    roads = [("High Road", "1"), ("Low Road", "2")]
+
+    assert road_list_hash(roads) == road_list_hash(roads[::-1])
+    assert road_list_hash(roads) != road_list_hash([("High Street", "1"), ("Low Road", "2")])
+
+
+def test_road_list_diff():
+    """Added, removed and renamed road IDs are told apart."""
+    diff = RoadListDiff.between(
+        {"1": "High Road", "2": "Low Road", "3": "Old Road"},
+        {"1": "High Road", "2": "Lower Road", "4": "New Road"},
+    )
+
+    assert diff.added == {"4"}
+    assert diff.removed == {"3"}
+    assert diff.renamed == {"2"}
+    assert diff.changed == {"2", "3", "4"}
+
+
+class FakeDirectory:
+    """Road directory stand-in serving queued road lists."""
+
+    def __init__(self):
+        """Initialize."""
+        self.responses = []
+        self.fetched = None
+
+    async def async_get_roads(self):
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        roads, self.fetched = response
+        return roads
+
+
+def _run(tmp_path, test):
+    """Run test(hass, validator, directory) on a throwaway hass."""
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        directory = hass.data[DATA_ROAD_DIRECTORY] = FakeDirectory()
+        try:
+            await test(hass, RoadValidator(hass), directory)
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_every_listener_hears_each_cycle(tmp_path):
+    """All sensors get the new timestamp; only changed roads are flagged."""
+    first = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    second = first + timedelta(days=7)
+
+    async def test(hass, validator, directory):
+        calls = []
+        directory.responses = [
+            ([("High Road", "1"), ("Low Road", "2")], first),
+            ([("High Road", "1"), ("Lower Road", "2")], second),
+            ([("High Road", "1"), ("Lower Road", "2")], second),
+        ]
+        validator.async_add_listener("1", lambda changed: calls.append(("1", changed)))
+        validator.async_add_listener("2", lambda changed: calls.append(("2", changed)))
+        await hass.async_block_till_done()
+        assert sorted(calls) == [("1", True), ("2", True)]
+        assert validator.is_valid("2", "Low Road")
+        assert validator.last_validated == first
+
+        calls.clear()
+        await validator.async_validate()
+        assert sorted(calls) == [("1", False), ("2", True)]
+        assert validator.is_valid("2", "Lower Road")
+        assert validator.last_validated == second
+
+        calls.clear()
+        await validator.async_validate()
+        assert sorted(calls) == [("1", False), ("2", False)]
+
+    _run(tmp_path, test)
+
+
+def test_stale_list_does_not_advance_last_validated(tmp_path):
+    """A cached list served while the site is down is not a fresh validation."""
+    fetched = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    async def test(hass, validator, directory):
+        roads = [("High Road", "1")]
+        directory.responses = [(roads, fetched), (roads, fetched)]
+        validator.async_add_listener("1", lambda changed: None)
+        await hass.async_block_till_done()
+        await validator.async_validate()
+
+        assert validator.last_validated == fetched
+
+    _run(tmp_path, test)
+
+
+def test_failed_first_validation_is_retried(tmp_path, monkeypatch):
+    """A failed first fetch is retried after the retry delay."""
+    monkeypatch.setattr(validation, "VALIDATION_RETRY_DELAY", timedelta(seconds=0.05))
+
+    async def test(hass, validator, directory):
+        calls = []
+        directory.responses = [OSError("down"), ([("High Road", "1")], datetime.now(timezone.utc))]
+        validator.async_add_listener("1", calls.append)
+        await hass.async_block_till_done()
+        assert calls == []
+        assert validator.is_valid("1", "High Road") is None
+
+        await asyncio.sleep(0.2)
+        await hass.async_block_till_done()
+        assert calls == [True]
+        assert validator.is_valid("1", "High Road")
+
+    _run(tmp_path, test)
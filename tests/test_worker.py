@@ -0,0 +1,37 @@
+"""Tests for the parse executor."""
+import asyncio
+
+import pytest
+
+from custom_components.cpbc_refuse_collection.parser import ParseTimeout, ScheduleStreamParser
+from custom_components.cpbc_refuse_collection.worker import ParseExecutor
+
+from .conftest import load_fixture
+
+
+@pytest.fixture
+def executor():
+    """Return a thread-backed parse executor."""
+    executor = ParseExecutor(1)
+    yield executor
+    executor.shutdown()
+
+
+def test_feed_budget_excludes_time_between_chunks(executor):
+    """Waiting for the next chunk does not use up the parse budget."""
+    body = load_fixture("schedule.html").encode()
+    stream = ScheduleStreamParser()
+
+    async def feed():
+        records = await executor.async_feed(stream.feed_bytes, body[:1024], budget=1)
+        await asyncio.sleep(1.2)
+        records += await executor.async_feed(stream.feed_bytes, body[1024:], budget=1)
+        return records + await executor.async_feed(stream.finish, budget=1)
+
+    assert len(asyncio.run(feed())) == 17
+
+
+def test_feed_without_budget_left(executor):
+    """A call with no budget left is refused without running."""
+    with pytest.raises(ParseTimeout):
+        asyncio.run(executor.async_feed(ScheduleStreamParser().finish, budget=0))
@@ -0,0 +1,176 @@
+"""Local stand-in for the Castle Point Borough Council waste calendar.
+
+Serves pages shaped like the council's ``wastecalendar`` road list and
+``wastecalendar.displayDetails`` schedule pages so the integration, the
+crawler and the soak harness can run without network access, and the test
+fixtures were saved from it:
+
+    python tools/council_stub.py --port 8080 --latency 0.25
+
+The pages are generated, not recorded: each road is assigned to one of a
+handful of collection rounds, and each round collects on a fixed weekday,
+alternating black and pink bins weekly. As on the real site, every month is
+rendered twice. Two extra road IDs serve edge cases: ``large`` returns
+three years of months and ``malformed`` returns truncated markup with
+unparseable headings and cells.
+
+Responses carry an ETag and honour ``If-None-Match``, are compressed
+when the client accepts it, and are delayed by ``--latency`` seconds.
+``/_stats`` returns request counts as JSON.
+"""
+import argparse
+import asyncio
+import calendar
+from collections import Counter
+from datetime import date
+import hashlib
+
+from aiohttp import web
+
+ROUNDS = 10
+ROAD_ID_START = 1000
+
+_STREET_NAMES = ("High", "Church", "Station", "London", "Park", "Victoria", "Green", "Manor")
+_STREET_TYPES = ("Road", "Street", "Avenue", "Close", "Drive", "Gardens", "Lane", "Way")
+
+
+def road_name(index):
+    """Return a deterministic road name for a road index."""
+    street = _STREET_NAMES[index % len(_STREET_NAMES)]
+    kind = _STREET_TYPES[(index // len(_STREET_NAMES)) % len(_STREET_TYPES)]
+    return f"{street} {kind} {index // (len(_STREET_NAMES) * len(_STREET_TYPES)) + 1}"
+
+
+def road_list_page(roads):
+    """Return a road list page with the given number of roads."""
+    options = "\n".join(
+        f'<option value="{ROAD_ID_START + index}">{road_name(index)}</option>'
+        for index in range(roads)
+    )
+    return (
+        "<html><head><title>Waste Calendar</title></head><body>"
+        '<form action="index.cfm?fa=wastecalendar.displayDetails" method="get">'
+        f'<select name="roadID" id="roadID">\n{options}\n</select>'
+        '<input type="submit" value="Show calendar"></form>'
+        "</body></html>"
+    )
+
+
+def _round_for_road(road_id):
+    """Return (weekday, pink parity) for the round a road belongs to."""
+    round_number = (int(road_id) if road_id.isdigit() else len(road_id)) % ROUNDS
+    return round_number % 5, round_number // 5
+
+
+def _month_container(year, month, weekday, pink_parity):
+    """Return one calendarContainer for a month."""
+    rows = []
+    for week in calendar.Calendar().monthdayscalendar(year, month):
+        cells = []
+        for column, day in enumerate(week):
+            if day == 0:
+                cells.append("<td></td>")
+                continue
+            if column == weekday:
+                week_number = date(year, month, day).toordinal() // 7
+                css_class = "pink" if week_number % 2 == pink_parity else "normal"
+            else:
+                css_class = "day"
+            cells.append(f'<td class="{css_class}" title="{day}">{day}</td>')
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    return (
+        '<div class="calendarContainer">'
+        f"<h2>{calendar.month_name[month]} {year}</h2>"
+        '<table class="calendar"><tr><th>Mon</th><th>Tue</th><th>Wed</th>'
+        "<th>Thu</th><th>Fri</th><th>Sat</th><th>Sun</th></tr>"
+        + "".join(rows)
+        + "</table></div>"
+    )
+
+
+def _months_from(start, count):
+    """Yield (year, month) for count months starting at a date."""
+    year, month = start.year, start.month
+    for _ in range(count):
+        yield year, month
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+
+def schedule_page(road_id, months=4, start=None):
+    """Return a displayDetails page for a road."""
+    start = start or date.today()
+    if road_id == "malformed":
+        return (
+            "<html><body>"
+            '<div class="calendarContainer"><h2>Smarch 20XX</h2><table><tr>'
+            '<td class="normal">x</td></tr></table></div>'
+            '<div class="calendarContainer"><table><tr><td class="pink">3</td></tr></table></div>'
+            + _month_container(start.year, start.month, 1, 0)
+            + '<div class="calendarContainer"><h2>'
+        )
+    if road_id == "large":
+        months, weekday, pink_parity = 36, 2, 1
+    else:
+        weekday, pink_parity = _round_for_road(road_id)
+    containers = "".join(
+        _month_container(year, month, weekday, pink_parity)
+        for year, month in _months_from(start, months)
+    )
+    return (
+        "<html><head><title>Waste Calendar</title></head><body>"
+        f'<div class="desktop">{containers}</div>'
+        f'<div class="mobile">{containers}</div>'
+        "</body></html>"
+    )
+
+
+def create_app(roads=1500, months=4, latency=0.0):
+    """Return the stand-in aiohttp application."""
+    stats = Counter()
+
+    async def index(request):
+        await asyncio.sleep(latency)
+        action = request.query.get("fa")
+        if action == "wastecalendar":
+            stats["road_list"] += 1
+            body = road_list_page(roads)
+        elif action == "wastecalendar.displayDetails":
+            stats["schedule"] += 1
+            body = schedule_page(request.query.get("roadID", ""), months)
+        else:
+            raise web.HTTPNotFound()
+        etag = '"' + hashlib.sha256(body.encode()).hexdigest()[:16] + '"'
+        if request.headers.get("If-None-Match") == etag:
+            stats["not_modified"] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        response = web.Response(text=body, content_type="text/html", headers={"ETag": etag})
+        response.enable_compression()
+        return response
+
+    async def stats_view(request):
+        return web.json_response(dict(stats))
+
+    app = web.Application()
+    app.router.add_get("/cpapps/index.cfm", index)
+    app.router.add_get("/_stats", stats_view)
+    return app
+
+
+def main():
+    """Run the stand-in server."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--roads", type=int, default=1500, help="number of roads in the road list")
+    parser.add_argument("--months", type=int, default=4, help="months on each schedule page")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to delay each response")
+    args = parser.parse_args()
+    web.run_app(
+        create_app(args.roads, args.months, args.latency), host=args.host, port=args.port
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""Scale and soak harness for the integration.
+
+Boots a throwaway Home Assistant instance with this repository's
+``custom_components`` and points the integration at the local council
+stand-in (``council_stub.py``, run as a subprocess so its work does not
+load the event loop under test). It then:
+
+1. creates ``--entries`` config entries across ``--roads`` distinct roads by
+   running that many config flows concurrently;
+2. for ``--duration`` seconds, repeatedly forces a concurrent refresh of
+   every coordinator and calls ``calendar.get_events`` on every calendar
+   entity the integration registered;
+3. prints a JSON report.
+
+Calendars are looked up in the entity registry rather than built by the
+harness, so an entry whose entities were rejected (for example as duplicate
+unique IDs) shows up as a gap between ``entries`` and ``calendar_entities``.
+
+The report covers event-loop lag (sampled by a ticker that measures how late
+its sleeps wake), peak RSS, request counts seen by the stand-in, the wall
+time of the config flows, each refresh round and the calendar queries, the
+parse and event-loop time of every refresh that parsed a page, and the
+coordinators' own refresh metrics.
+
+    python tools/soak.py --entries 500 --roads 150 --latency 0.2 --duration 120
+
+Requires the ``homeassistant`` package; no network access is needed.
+"""
+import argparse
+import asyncio
+from datetime import timedelta
+import json
+import os
+import resource
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import time
+
+from aiohttp import ClientSession
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import council_stub  # noqa: E402
+from homeassistant import bootstrap, runner  # noqa: E402
+from homeassistant.components.calendar import DOMAIN as CALENDAR_DOMAIN  # noqa: E402
+from homeassistant.helpers import entity_registry as er  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from custom_components.cpbc_refuse_collection import common, coordinator  # noqa: E402
+from custom_components.cpbc_refuse_collection.const import DOMAIN  # noqa: E402
+from custom_components.cpbc_refuse_collection.coordinator import (  # noqa: E402
+    async_get_coordinator_registry,
+)
+
+LAG_SAMPLE_INTERVAL = 0.05
+
+
+def _free_port():
+    """Return a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _peak_rss_mb():
+    """Return this process's peak resident set size in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _summary(samples):
+    """Return count, mean, p50, p99 and max of a list of seconds, in ms."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+class LagMonitor:
+    """Sample how late the event loop wakes a sleeping task."""
+
+    def __init__(self):
+        """Initialize."""
+        self.samples = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+            self.samples.append(max(0.0, loop.time() - start - LAG_SAMPLE_INTERVAL))
+
+    def start(self):
+        """Start sampling."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        """Stop sampling."""
+        self._task.cancel()
+
+
+async def _start_stub(port, roads, latency):
+    """Start the council stand-in as a subprocess and wait until it answers."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(REPO_ROOT, "tools", "council_stub.py"),
+        "--port", str(port), "--roads", str(roads), "--latency", str(latency),
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+    )
+    async with ClientSession() as session:
+        for _ in range(100):
+            try:
+                async with session.get(f"http://127.0.0.1:{port}/_stats"):
+                    return process
+            except OSError:
+                await asyncio.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Council stand-in did not start")
+
+
+async def _stub_stats(port):
+    """Return the stand-in's request counters."""
+    async with ClientSession() as session:
+        async with session.get(f"http://127.0.0.1:{port}/_stats") as response:
+            return await response.json()
+
+
+def _point_integration_at(base_url):
+    """Point the integration's council URLs at the stand-in."""
+    common.ROAD_LIST_URL = base_url + "?fa=wastecalendar"
+    coordinator.DISPLAY_DETAILS_URL = base_url + "?fa=wastecalendar.displayDetails&roadID={road_id}"
+
+
+async def _async_config_flow(hass, road_name, road_id):
+    """Create an entry for a road through the search-then-select config flow."""
+    flow = await hass.config_entries.flow.async_init(DOMAIN, context={"source": "user"})
+    flow = await hass.config_entries.flow.async_configure(flow["flow_id"], {"search": road_name})
+    flow = await hass.config_entries.flow.async_configure(flow["flow_id"], {"road_id": road_id})
+    if flow["type"] != "create_entry":
+        raise RuntimeError(f"Config flow for {road_name} ended with {flow['type']}")
+
+
+def _calendar_entity_ids(hass):
+    """Return the calendar entities the integration registered."""
+    return [
+        entity.entity_id
+        for entity in er.async_get(hass).entities.values()
+        if entity.platform == DOMAIN and entity.domain == CALENDAR_DOMAIN
+    ]
+
+
+async def _async_get_events(hass, entity_id, start, end):
+    """Query a calendar entity through the calendar.get_events service."""
+    response = await hass.services.async_call(
+        CALENDAR_DOMAIN,
+        "get_events",
+        {"entity_id": entity_id, "start_date_time": start, "end_date_time": end},
+        blocking=True,
+        return_response=True,
+    )
+    return len(response[entity_id]["events"])
+
+
+def _record_parses(parse_times, loop_times):
+    """Record the parse and loop time of every refresh that parses a page.
+
+    A 304 resets the coordinators' last_* times to zero, so they are read as
+    each refresh finishes rather than once at the end. Must be called before
+    any coordinator is created.
+    """
+    coordinator_class = coordinator.CpbcRefuseCollectionCalendarDataCoordinator
+    update = coordinator_class._async_update_data
+
+    async def recorded_update(self):
+        before = self.metrics.parsed + self.metrics.unchanged
+        data = await update(self)
+        if self.metrics.parsed + self.metrics.unchanged > before:
+            parse_times.append(self.metrics.last_parse_time)
+            loop_times.append(self.metrics.last_loop_time)
+        return data
+
+    coordinator_class._async_update_data = recorded_update
+
+
+async def _timed(coroutine):
+    """Await a coroutine and return its wall time in seconds."""
+    start = time.perf_counter()
+    await coroutine
+    return time.perf_counter() - start
+
+
+async def run(args):
+    """Run the harness and return the report."""
+    config_dir = tempfile.mkdtemp(prefix="cpbc_soak_")
+    os.symlink(os.path.join(REPO_ROOT, "custom_components"), os.path.join(config_dir, "custom_components"))
+    with open(os.path.join(config_dir, "configuration.yaml"), "w") as config_file:
+        config_file.write(f"homeassistant:\n  name: soak\nhttp:\n  server_port: {_free_port()}\n")
+
+    stub_port = _free_port()
+    stub = await _start_stub(stub_port, args.roads, args.latency)
+    _point_integration_at(f"http://127.0.0.1:{stub_port}/cpapps/index.cfm")
+    parse_times = []
+    loop_times = []
+    _record_parses(parse_times, loop_times)
+
+    lag = LagMonitor()
+    report = {"parameters": vars(args)}
+    hass = None
+    try:
+        hass = await bootstrap.async_setup_hass(runner.RuntimeConfig(config_dir=config_dir))
+        await hass.async_start()
+        lag.start()
+
+        roads = [
+            (council_stub.road_name(index), str(council_stub.ROAD_ID_START + index))
+            for index in range(args.roads)
+        ]
+        targets = [roads[index % len(roads)] for index in range(args.entries)]
+        report["config_flows_s"] = await _timed(
+            asyncio.gather(*(_async_config_flow(hass, name, road_id) for name, road_id in targets))
+        )
+        await hass.async_block_till_done()
+        report["entries"] = len(hass.config_entries.async_entries(DOMAIN))
+
+        registry = async_get_coordinator_registry(hass)
+        coordinators = [registry.get(road_id) for _, road_id in roads]
+        coordinators = [item for item in coordinators if item is not None]
+        report["coordinators"] = len(coordinators)
+        calendars = _calendar_entity_ids(hass)
+        report["calendar_entities"] = len(calendars)
+
+        refresh_rounds = []
+        query_rounds = []
+        deadline = time.monotonic() + args.duration
+        while True:
+            refresh_rounds.append(
+                await _timed(asyncio.gather(*(item.async_refresh() for item in coordinators)))
+            )
+            now = dt_util.utcnow()
+            end = now + timedelta(days=args.query_days)
+            query_start = time.perf_counter()
+            event_counts = await asyncio.gather(*(
+                _async_get_events(hass, entity_id, now, end) for entity_id in calendars
+            ))
+            query_rounds.append(time.perf_counter() - query_start)
+            report["calendar_events_returned"] = sum(event_counts)
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(args.interval)
+
+        report["refresh_rounds"] = _summary(refresh_rounds)
+        report["calendar_query_rounds"] = _summary(query_rounds)
+        report["event_loop_lag"] = _summary(lag.samples)
+        report["requests"] = await _stub_stats(stub_port)
+        report["coordinator_metrics"] = {
+            name: sum(getattr(item.metrics, name) for item in coordinators)
+            for name in ("requests", "not_modified", "unchanged", "parsed", "failed")
+        }
+        report["parse_time"] = _summary(parse_times)
+        report["loop_time"] = _summary(loop_times)
+        report["peak_rss_mb"] = _peak_rss_mb()
+    finally:
+        lag.stop()
+        if hass is not None:
+            await hass.async_stop()
+        stub.terminate()
+        await stub.wait()
+        shutil.rmtree(config_dir, ignore_errors=True)
+    return report
+
+
+def main():
+    """Run the harness from the command line."""
+    parser = argparse.ArgumentParser(description="Scale and soak test the integration.")
+    parser.add_argument("--entries", type=int, default=200, help="config entries to create")
+    parser.add_argument("--roads", type=int, default=50, help="distinct roads the entries use")
+    parser.add_argument("--latency", type=float, default=0.1, help="stand-in response delay")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to keep refreshing")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between rounds")
+    parser.add_argument("--query-days", type=int, default=90, help="calendar query window")
+    parser.add_argument("-o", "--output", help="write the report here instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as report_file:
+            report_file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()